@@ -0,0 +1,103 @@
+"""Memory benchmark — dict pipeline payloads vs. slotted records at batch scale.
+
+Builds the per-service objects a batch keeps in flight (WSDL info, REST
+enrichment with its layers, AI results) for N synthetic services, once as
+the free-form dicts the pipeline used to pass around and once as the
+records in metagen.records, and reports the traced allocation for each.
+
+Usage:
+    uv run python benchmarks/records_memory.py [N_SERVICES] [LAYERS_PER_SERVICE]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from metagen.records import AiResult, RestEnrichment, ServiceInfo
+
+OPERATIONS = [
+    "ExportMapImage", "Find", "GetDefaultMapName", "GetDocumentInfo",
+    "GetLegendInfo", "GetMapCount", "GetMapName", "GetServerInfo",
+    "Identify", "QueryFeatureCount", "QueryFeatureData",
+]
+
+
+def _raw(i: int, n_layers: int) -> tuple[dict, dict, dict]:
+    """Synthetic per-service payload in the dict shapes the readers emit."""
+    name = f"EDW_Service{i}_01_MapServer"
+    endpoint = f"https://apps.fs.usda.gov/arcx/services/EDW/EDW_Service{i}_01/MapServer"
+    info = {
+        "service_name": name,
+        "endpoint_url": endpoint,
+        "target_namespace": "http://www.esri.com/schemas/ArcGIS/3.5.0",
+        "operations": list(OPERATIONS),
+        "domain": "apps.fs.usda.gov",
+        "publisher_name": "U.S. Forest Service",
+        "publisher_subOrganizationOf": "U.S. Department of Agriculture",
+        "title": f"EDW Service{i} 01",
+    }
+    rest = {
+        "service_description": f"Service {i} description",
+        "description": None,
+        "document_title": f"Service {i}",
+        "document_subject": None,
+        "document_author": "USFS",
+        "document_keywords": ["forest", "activity"],
+        "copyright_text": None,
+        "spatial_reference_wkid": 4269,
+        "full_extent": None,
+        "initial_extent": None,
+        "layers": [
+            {"id": j, "name": f"Layer {j}", "type": "Feature Layer", "description": ""}
+            for j in range(n_layers)
+        ],
+        "capabilities": "Map,Query,Data",
+    }
+    ai = {
+        "description": f"Service {i} description",
+        "modified": "2024-01-01",
+        "contactPoint": {"fn": "USFS", "hasEmail": "mailto:sm.fs.data@usda.gov"},
+        "bureauCode": ["005:96"],
+        "programCode": ["005:059"],
+        "license": "https://creativecommons.org/publicdomain/zero/1.0/",
+        "spatial": "-125.0,24.0,-66.0,49.0",
+        "temporal": "2000-01-01/2024-01-01",
+        "theme": ["environment"],
+    }
+    return info, rest, ai
+
+
+def _measure(build, n: int, n_layers: int) -> tuple[int, list]:
+    gc.collect()
+    tracemalloc.start()
+    held = [build(*_raw(i, n_layers)) for i in range(n)]
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, held
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_layers = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    dict_bytes, held = _measure(lambda info, rest, ai: (info, rest, ai), n, n_layers)
+    del held
+    record_bytes, held = _measure(
+        lambda info, rest, ai: (
+            ServiceInfo.from_dict(info),
+            RestEnrichment.from_dict(rest),
+            AiResult.from_dict(ai),
+        ),
+        n, n_layers,
+    )
+    del held
+
+    mib = 1024 * 1024
+    print(f"{n} services, {n_layers} layers each")
+    print(f"  dicts:   {dict_bytes / mib:8.1f} MiB")
+    print(f"  records: {record_bytes / mib:8.1f} MiB")
+    print(f"  saved:   {100 * (1 - record_bytes / dict_bytes):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
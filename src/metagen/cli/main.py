@@ -1,47 +1,73 @@
 """metagen CLI entry point."""
-import json
 from pathlib import Path
 
 import click
 
 
+def _parse_formats(ctx: click.Context, param: click.Parameter, value: str) -> list[str]:
+    """Split a comma-separated --formats value and validate each name."""
+    from metagen.metadata.writers import WRITERS
+
+    formats = []
+    for name in value.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in WRITERS:
+            raise click.BadParameter(
+                f"unknown format {name!r} (choose from {', '.join(WRITERS)})"
+            )
+        if name not in formats:
+            formats.append(name)
+    if not formats:
+        raise click.BadParameter("at least one format is required")
+    return formats
+
+
 @click.group()
 @click.version_option(version="0.1.0", prog_name="metagen")
 def main() -> None:
     """AI-powered metadata generation for geospatial and tabular datasets."""
 
 
-@main.command()
-@click.argument("wsdl_file", type=click.Path(exists=True, path_type=Path))
-@click.argument("output_json", required=False, default=None, type=click.Path(path_type=Path))
-@click.option("--ai", is_flag=True, help="Enable AI gap filling.")
-@click.option(
-    "--bot",
-    type=click.Choice(["verde", "claude"], case_sensitive=False),
-    default="verde",
-    show_default=True,
-    help="AI bot to use (requires --ai).",
-)
-def crosswalk(wsdl_file: Path, output_json: Path | None, ai: bool, bot: str) -> None:
-    """Generate a DCAT-US catalog record and gap report from an ESRI WSDL file.
+def _parse_shard(ctx: click.Context, param: click.Parameter, value: str | None) -> tuple[int, int] | None:
+    """Validate a --shard K/N value."""
+    if value is None:
+        return None
+    from metagen.sharding import parse_shard
+
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
 
-    WSDL_FILE   Path to the ESRI ArcGIS MapServer WSDL XML file.
-    OUTPUT_JSON Path for the output DCAT-US JSON (default: <wsdl_stem>_dcat_us.json).
+
+def _output_stem(name: str, used: set[str]) -> str:
+    """Per-service output name for an input member: its relative path without suffix.
+
+    Directories are kept so a/Roads.xml and b/Roads.xml do not collide;
+    absolute and ".." components are dropped so outputs stay under the
+    output directory. Names still taken (Roads.xml vs Roads.wsdl) get a
+    numeric suffix.
     """
-    from metagen.readers.wsdl import parse_wsdl
-    from metagen.readers.rest import wsdl_endpoint_to_rest_url, fetch_rest_metadata, extract_enrichment
-    from metagen.metadata.dcat_us import build_dcat_us
-    from metagen.reports.gap import gap_report
+    from pathlib import PurePosixPath
 
-    if output_json is None:
-        output_json = wsdl_file.with_name(f"{wsdl_file.stem}_dcat_us.json")
+    parts = [p for p in PurePosixPath(name.replace("\\", "/")).parts if p not in ("/", ".", "..")]
+    stem = PurePosixPath(*parts).with_suffix("").as_posix() if parts else "service"
+    candidate, n = stem, 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem}_{n}"
+    used.add(candidate)
+    return candidate
 
-    # 1. Parse WSDL
-    info = parse_wsdl(wsdl_file)
 
-    # 2. Fetch REST metadata (always — provides context for AI and enriches output)
+def _fetch_rest(info):
+    """Fetch REST enrichment for one service; returns a RestEnrichment or None."""
+    from metagen.readers.rest import wsdl_endpoint_to_rest_url, fetch_rest_metadata, extract_enrichment
+
     rest_info = None
-    endpoint = info.get("endpoint_url", "")
+    endpoint = info.endpoint_url or ""
     rest_url = wsdl_endpoint_to_rest_url(endpoint)
     if rest_url:
         click.echo(f"Fetching REST metadata from: {rest_url}", err=True)
@@ -51,31 +77,544 @@ def crosswalk(wsdl_file: Path, output_json: Path | None, ai: bool, bot: str) ->
             click.echo("REST metadata retrieved successfully.", err=True)
         else:
             click.echo("Proceeding with WSDL data only (REST unavailable).", err=True)
+    return rest_info
+
+
+def _classify_themes(services: list, local_themes: bool, theme_threshold: float) -> list:
+    """Run the local theme classifier over (info, rest_info) pairs, or return Nones."""
+    if not local_themes:
+        return [None] * len(services)
+    from metagen.metadata.themes import classify_corpus
+
+    return classify_corpus(services, threshold=theme_threshold)
+
+
+def _cluster(services: list, cluster: bool, cluster_threshold: float) -> list[int]:
+    """Map each (info, rest_info) pair to its cluster representative's index."""
+    if not cluster:
+        return list(range(len(services)))
+    from metagen.clustering import cluster_services
+
+    representatives = cluster_services(services, threshold=cluster_threshold)
+    click.echo(
+        f"Grouped {len(services)} services into {len(set(representatives))} clusters "
+        "for AI gap filling.",
+        err=True,
+    )
+    return representatives
+
+
+def _fill(
+    info,
+    rest_info,
+    themes,
+    ai: bool,
+    bot: str,
+    hedge_bot: str | None,
+    hedge_after: float,
+    max_repairs: int,
+):
+    """Run AI gap filling for one service if enabled.
+
+    A confident local theme is not requested from the LLM.
+
+    Returns (ai_results, ai_metadata).
+    """
+    from metagen.records import GAP_FIELDS, AiResult
 
-    # 3. AI gap filling (opt-in via --ai)
-    ai_results: dict = {}
+    ai_results = AiResult()
     ai_metadata: dict = {"source": "none"}
     if ai:
         from metagen.llm.gap_filler import ai_gap_fill
+        skip_fields = frozenset()
+        if themes is not None and themes.confident:
+            skip_fields = frozenset({"theme"})
         click.echo("Running AI gap-filling...", err=True)
-        ai_results, ai_metadata = ai_gap_fill(info, rest_info, bot=bot)
+        ai_results, ai_metadata = ai_gap_fill(
+            info, rest_info, bot=bot, hedge_bot=hedge_bot, hedge_after=hedge_after,
+            max_repairs=max_repairs, skip_fields=skip_fields,
+        )
         if ai_metadata.get("source") == "ai":
-            filled = sum(1 for v in ai_results.values() if v is not None)
-            click.echo(f"AI suggested values for {filled} of 9 gap fields.", err=True)
+            filled = ai_results.filled_count()
+            click.echo(
+                f"AI suggested values for {filled} of {len(GAP_FIELDS) - len(skip_fields)} gap fields "
+                f"({ai_metadata['bot']}, {ai_metadata['latency']:.1f}s).",
+                err=True,
+            )
         else:
             click.echo(f"AI gap-filling unavailable: {ai_metadata.get('error', 'unknown')}", err=True)
 
-    # 4. Build DCAT-US catalog
-    catalog = build_dcat_us(info, ai_results=ai_results)
+    return ai_results, ai_metadata
 
-    # 5. Write JSON output
-    output_json.write_text(json.dumps(catalog, indent=2, ensure_ascii=False), encoding="utf-8")
+
+@main.command()
+@click.argument("wsdl_file", type=click.Path(exists=True, path_type=Path))
+@click.argument("output_json", required=False, default=None, type=click.Path(path_type=Path))
+@click.option("--ai", is_flag=True, help="Enable AI gap filling.")
+@click.option(
+    "--bot",
+    type=click.Choice(["verde", "claude"], case_sensitive=False),
+    default="verde",
+    show_default=True,
+    help="AI bot to use (requires --ai).",
+)
+@click.option(
+    "--hedge-bot",
+    type=click.Choice(["verde", "claude"], case_sensitive=False),
+    default=None,
+    help="Secondary bot to hedge slow or failed --bot requests with (requires --ai).",
+)
+@click.option(
+    "--hedge-after",
+    type=click.FloatRange(min=0),
+    default=10.0,
+    show_default=True,
+    help="Seconds to wait on --bot before sending the request to --hedge-bot.",
+)
+@click.option(
+    "--max-repairs",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Follow-up requests per service for missing or invalid AI fields.",
+)
+@click.option(
+    "--local-themes/--no-local-themes",
+    default=False,
+    show_default=True,
+    help=(
+        "Assign ISO topic themes and keywords with the local term-weight classifier; "
+        "with --ai only services it cannot classify confidently have their theme "
+        "requested from the LLM."
+    ),
+)
+@click.option(
+    "--theme-threshold",
+    type=click.FloatRange(min=0, max=1),
+    default=0.6,
+    show_default=True,
+    help=(
+        "Classifier confidence below which the theme is left to --ai. Confidence "
+        "needs at least two distinct matching terms to exceed 0.5."
+    ),
+)
+@click.option(
+    "--cluster",
+    is_flag=True,
+    help="Send one AI request per group of near-duplicate services and copy its contact, "
+    "license and bureau/program codes to the other members, which make no AI request "
+    "(directory/archive input with --ai only). With --shard, services are assigned by "
+    "host, publisher and name without the version suffix, so X_01 and X_02 share a shard.",
+)
+@click.option(
+    "--cluster-threshold",
+    type=click.FloatRange(min=0, max=1),
+    default=0.8,
+    show_default=True,
+    help="Minimum estimated similarity for two services to share a cluster.",
+)
+@click.option(
+    "--formats",
+    default="dcat-us",
+    show_default=True,
+    callback=_parse_formats,
+    help="Comma-separated output formats: dcat-us, iso19115, fgdc.",
+)
+@click.option(
+    "--shard",
+    default=None,
+    metavar="K/N",
+    callback=_parse_shard,
+    help="Only process services hashed to shard K of N (directory/archive input only).",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Processes used to parse WSDL files (directory/archive input only).",
+)
+@click.option(
+    "--output-archive",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Zip file to write per-service outputs into (directory/archive input only).",
+)
+def crosswalk(
+    wsdl_file: Path,
+    output_json: Path | None,
+    ai: bool,
+    bot: str,
+    hedge_bot: str | None,
+    hedge_after: float,
+    max_repairs: int,
+    local_themes: bool,
+    theme_threshold: float,
+    cluster: bool,
+    cluster_threshold: float,
+    formats: list[str],
+    shard: tuple[int, int] | None,
+    workers: int,
+    output_archive: Path | None,
+) -> None:
+    """Generate catalog records and a gap report from ESRI WSDL files.
+
+    The WSDL is parsed, enriched and gap-filled once; every format listed
+    in --formats is then rendered from the same metadata record. With
+    --local-themes, themes and extra keywords come from a local classifier
+    that scores each service on its own text; only services it cannot
+    classify confidently have their theme requested from the LLM.
+
+    With --cluster, near-duplicate services in a directory or archive from
+    the same host and publisher (same name apart from a _01/_02 suffix, same
+    description, overlapping layers) are grouped. Only the first of each
+    group is sent to the LLM; its contactPoint, license, bureauCode and
+    programCode are copied to the other members, which make no LLM request.
+    Their description and spatial extent are read from REST metadata when
+    available, and their other fields are left as gaps.
+
+    If WSDL_FILE is a directory or a zip/tar archive, every .xml/.wsdl file
+    in it is crosswalked into one DCAT-US catalog plus aggregate gap
+    statistics. Archive members are streamed without extracting them to
+    disk; --output-archive collects the per-service outputs in a zip
+    instead of loose files. Per-service outputs keep each input's relative
+    directory (a/Roads.xml → a/Roads_iso19115.xml). With --shard K/N
+    only the services whose endpoint URL (with --cluster: host, publisher
+    and normalized name) hashes to shard K are processed and the outputs
+    are named <stem>.shard-K-of-N.*; combine them with `merge`.
+
+    WSDL_FILE   Path to an ESRI ArcGIS MapServer WSDL XML file, or a directory
+                or zip/tar archive of them.
+    OUTPUT_JSON Path for the output DCAT-US JSON (default: <wsdl_stem>_dcat_us.json,
+                or <dir>_dcat_us.json for a directory or archive). ISO 19115 and FGDC files
+                are written alongside it as <wsdl_stem>_iso19115.xml and
+                <wsdl_stem>_fgdc.xml.
+    """
+    from metagen.readers.archive import is_archive
+
+    if wsdl_file.is_dir() or is_archive(wsdl_file):
+        _crosswalk_corpus(
+            wsdl_file, output_json, formats, shard, workers, output_archive,
+            local_themes, theme_threshold, cluster and ai, cluster_threshold,
+            ai=ai, bot=bot, hedge_bot=hedge_bot, hedge_after=hedge_after,
+            max_repairs=max_repairs,
+        )
+        return
+    if shard is not None or output_archive is not None or workers > 1 or cluster:
+        raise click.UsageError(
+            "--shard, --workers, --output-archive and --cluster require a directory "
+            "or archive of WSDL files."
+        )
+
+    from metagen.readers.wsdl import parse_wsdl
+    from metagen.metadata.model import build_record
+    from metagen.metadata.writers import WRITERS, write_formats
+    from metagen.reports.gap import gap_report
+
+    if output_json is None:
+        output_json = wsdl_file.with_name(f"{wsdl_file.stem}_dcat_us.json")
+
+    # 1. Parse WSDL
+    info = parse_wsdl(wsdl_file)
+
+    # 2. REST enrichment (always — provides context for AI and enriches output)
+    rest_info = _fetch_rest(info)
+
+    # 3. Local theme classification, then AI gap filling (opt-in via --ai)
+    [themes] = _classify_themes([(info, rest_info)], local_themes, theme_threshold)
+    ai_results, ai_metadata = _fill(
+        info, rest_info, themes, ai, bot, hedge_bot, hedge_after, max_repairs
+    )
+
+    # 4. Resolve the shared metadata record
+    record = build_record(info, ai_results=ai_results, themes=themes)
+
+    # 5. Render every requested format from the same record
+    paths = {
+        name: output_json if name == "dcat-us"
+        else output_json.parent / f"{wsdl_file.stem}{WRITERS[name].suffix}"
+        for name in formats
+    }
+    write_formats(record, paths)
 
     # 6. Generate and save gap report
-    md_content, report_path = gap_report(info, ai_results=ai_results, ai_metadata=ai_metadata)
+    md_content, report_path = gap_report(
+        info, ai_results=ai_results, ai_metadata=ai_metadata, themes=themes
+    )
+    click.echo(md_content)
+    click.echo(f"Gap report written to:   {report_path}")
+    for name, path in paths.items():
+        click.echo(f"{name} output written to: {path}")
+
+
+def _crosswalk_corpus(
+    source: Path,
+    output_json: Path | None,
+    formats: list[str],
+    shard: tuple[int, int] | None,
+    workers: int,
+    output_archive: Path | None,
+    local_themes: bool,
+    theme_threshold: float,
+    cluster: bool,
+    cluster_threshold: float,
+    **fill_options,
+) -> None:
+    """Crosswalk every WSDL in a directory or archive (optionally one shard of them).
+
+    With clustering enabled the run has two passes: every service in the
+    shard is parsed and REST-enriched first, so clustering sees the whole
+    corpus at once, then records are gap-filled and written one at a time.
+    Otherwise services stream straight through.
+    """
+    import json
+    import zipfile
+    from dataclasses import replace
+
+    from metagen.clustering import SharedValues, cluster_shard_key
+    from metagen.readers.archive import (
+        archive_stem,
+        iter_archive_members,
+        iter_directory_members,
+        parse_wsdl_members,
+    )
+    from metagen.metadata.model import build_record
+    from metagen.metadata.dcat_us import dataset_from_record, write_dcat_catalog
+    from metagen.metadata.writers import WRITERS, write_formats, write_formats_to_zip
+    from metagen.readers.rest import rest_gap_values
+    from metagen.reports.gap import gap_summary_report, new_gap_stats, update_gap_stats
+    from metagen.sharding import in_shard, shard_label
+
+    if source.is_dir():
+        members = iter_directory_members(source)
+        stem = source.name
+    else:
+        members = iter_archive_members(source)
+        stem = archive_stem(source)
+
+    if output_json is None:
+        output_json = source.with_name(f"{stem}_dcat_us.json")
+    if shard is not None:
+        label = shard_label(*shard)
+        output_json = output_json.with_name(f"{output_json.stem}.{label}{output_json.suffix}")
+        if output_archive is not None:
+            output_archive = output_archive.with_name(
+                f"{output_archive.stem}.{label}{output_archive.suffix}"
+            )
+    stats_path = output_json.with_suffix(".gap_stats.json")
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    if output_archive is not None:
+        output_archive.parent.mkdir(parents=True, exist_ok=True)
+
+    stats = new_gap_stats()
+    if shard is not None:
+        stats["shard"] = list(shard)
+        if cluster:
+            stats["shard_key"] = "cluster"
+    # Per-service files: every format into --output-archive, else non-DCAT formats alongside
+    per_service = formats if output_archive is not None else [f for f in formats if f != "dcat-us"]
+    skipped = 0
+    output_stems: set[str] = set()
+
+    def enriched():
+        nonlocal skipped
+        for name, info in parse_wsdl_members(members, workers=workers):
+            if shard is not None:
+                # With clustering, versions of one service must land in the same shard
+                key = cluster_shard_key(info) if cluster else info.endpoint_url or name
+                if not in_shard(key, *shard):
+                    skipped += 1
+                    continue
+            click.echo(f"Crosswalking {name}", err=True)
+            yield name, info, _fetch_rest(info)
+
+    # With --cluster the shard is read up front so clustering sees all of it
+    services = enriched()
+    sharing = None
+    if cluster:
+        services = list(services)
+        sharing = SharedValues(_cluster(
+            [(info, rest_info) for _name, info, rest_info in services], cluster, cluster_threshold
+        ))
+
+    def datasets(zf: zipfile.ZipFile | None):
+        for index, (name, info, rest_info) in enumerate(services):
+            [themes] = _classify_themes([(info, rest_info)], local_themes, theme_threshold)
+            if sharing is not None and sharing.is_member(index):
+                # No LLM request: shared fields from the representative, the rest from REST or gaps
+                representative_name, ai_results = sharing.take(index)
+                click.echo(
+                    f"Sharing AI values from cluster representative {representative_name}", err=True
+                )
+                local_values = rest_gap_values(rest_info)
+                if local_values is not None:
+                    info = replace(info, source_values=local_values)
+            else:
+                ai_results, _ai_metadata = _fill(info, rest_info, themes, **fill_options)
+                if sharing is not None:
+                    sharing.add(index, name, ai_results)
+            record = build_record(info, ai_results=ai_results, themes=themes)
+            update_gap_stats(stats, info, ai_results, themes)
+
+            member_stem = _output_stem(name, output_stems)
+            if zf is not None:
+                write_formats_to_zip(record, zf, {
+                    fmt: f"{member_stem}{WRITERS[fmt].suffix}" for fmt in per_service
+                })
+            elif per_service:
+                write_formats(record, {
+                    fmt: output_json.parent / f"{member_stem}{WRITERS[fmt].suffix}"
+                    for fmt in per_service
+                })
+            yield dataset_from_record(record)
+
+    def run(zf: zipfile.ZipFile | None) -> int:
+        if "dcat-us" in formats:
+            with open(output_json, "wb") as fh:
+                return write_dcat_catalog(datasets(zf), fh)
+        return sum(1 for _ in datasets(zf))
+
+    if output_archive is not None:
+        with zipfile.ZipFile(output_archive, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            count = run(zf)
+    else:
+        count = run(None)
+
+    stats_path.write_text(json.dumps(stats, indent=2), encoding="utf-8")
+
+    if shard is None:
+        md_content, report_path = gap_summary_report(stats)
+        click.echo(md_content)
+        click.echo(f"Gap report written to:   {report_path}")
+    else:
+        click.echo(f"Shard {shard[0]}/{shard[1]}: {count} services ({skipped} in other shards).")
+    if sharing is not None:
+        click.echo(
+            f"Cluster members sharing representative values: {sharing.members} of {count} "
+            f"services ({sharing.members} AI requests saved)."
+        )
+    if "dcat-us" in formats:
+        click.echo(f"DCAT-US JSON written to: {output_json} ({count} records)")
+    if output_archive is not None:
+        click.echo(f"Per-service outputs written to: {output_archive}")
+    click.echo(f"Gap statistics written to: {stats_path}")
+
+
+@main.command()
+@click.argument(
+    "shard_catalogs", nargs=-1, required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "-o", "--output", "output_json",
+    default="data.json",
+    show_default=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Path for the merged DCAT-US catalog.",
+)
+def merge(shard_catalogs: tuple[Path, ...], output_json: Path) -> None:
+    """Merge per-shard outputs of `crosswalk --shard` into one catalog and report.
+
+    Each SHARD_CATALOG's gap statistics are read from its sibling
+    <stem>.gap_stats.json file; statistics files passed directly (e.g. via
+    a shell glob) are ignored.
+    """
+    import json
+
+    from metagen.metadata.dcat_us import write_dcat_catalog
+    from metagen.reports.gap import gap_summary_report, merge_gap_stats, new_gap_stats
+
+    stats = new_gap_stats()
+    seen: dict[int, Path] = {}
+    counts: set[int] = set()
+    shard_keys: set[str] = set()
+    shard_catalogs = tuple(p for p in shard_catalogs if not p.name.endswith(".gap_stats.json"))
+    for path in shard_catalogs:
+        stats_path = path.with_suffix(".gap_stats.json")
+        if not stats_path.exists():
+            raise click.ClickException(f"Missing gap statistics for {path}: {stats_path}")
+        shard_stats = json.loads(stats_path.read_text(encoding="utf-8"))
+        if "shard" in shard_stats:
+            shard_no, shard_count = shard_stats["shard"]
+            if shard_no in seen:
+                raise click.ClickException(
+                    f"Shard {shard_no}/{shard_count} given twice: {seen[shard_no]} and {path}"
+                )
+            seen[shard_no] = path
+            counts.add(shard_count)
+            shard_keys.add(shard_stats.get("shard_key", "endpoint"))
+        stats = merge_gap_stats(stats, shard_stats)
+
+    if len(counts) > 1:
+        raise click.ClickException(f"Shards come from runs with different N: {sorted(counts)}")
+    if len(shard_keys) > 1:
+        raise click.ClickException("Shards come from runs with and without --cluster")
+    if counts:
+        missing = sorted(set(range(1, counts.pop() + 1)) - set(seen))
+        if missing:
+            click.echo(f"Warning: shards not merged: {', '.join(map(str, missing))}", err=True)
+
+    def datasets():
+        for path in shard_catalogs:
+            catalog = json.loads(path.read_text(encoding="utf-8"))
+            yield from catalog.get("dataset", [])
+
+    with open(output_json, "wb") as fh:
+        count = write_dcat_catalog(datasets(), fh)
+
+    md_content, report_path = gap_summary_report(stats)
+    click.echo(md_content)
+    click.echo(f"Gap report written to:   {report_path}")
+    click.echo(f"DCAT-US JSON written to: {output_json} ({count} records)")
+
+
+@main.command("crosswalk-metadata")
+@click.argument("source_xml", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("output_json", required=False, default=None, type=click.Path(path_type=Path))
+def crosswalk_metadata(source_xml: Path, output_json: Path | None) -> None:
+    """Crosswalk existing FGDC or ISO 19139 metadata XML to DCAT-US.
+
+    Records are streamed one at a time, so multi-record dumps of any size
+    can be converted. A single-record file gets a full gap report; larger
+    files get an aggregate gap summary.
+
+    SOURCE_XML  Path to an FGDC CSDGM or ISO 19139 XML file (one or many records).
+    OUTPUT_JSON Path for the output DCAT-US JSON (default: <source_stem>_dcat_us.json).
+    """
+    from metagen.readers.metadata_xml import detect_standard, iter_metadata_records
+    from metagen.metadata.model import build_record
+    from metagen.metadata.dcat_us import dataset_from_record, write_dcat_catalog
+    from metagen.reports.gap import gap_report, gap_summary_report, new_gap_stats, update_gap_stats
+
+    if output_json is None:
+        output_json = source_xml.with_name(f"{source_xml.stem}_dcat_us.json")
+
+    standard = detect_standard(source_xml)
+    if standard is None:
+        raise click.ClickException(f"No FGDC or ISO 19139 records found in {source_xml}")
+    click.echo(f"Detected source standard: {standard}", err=True)
+
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    stats = new_gap_stats()
+    first_info: list = []
+
+    def datasets():
+        for info in iter_metadata_records(source_xml):
+            if not first_info:
+                first_info.append(info)
+            update_gap_stats(stats, info)
+            yield dataset_from_record(build_record(info))
+
+    with open(output_json, "wb") as fh:
+        count = write_dcat_catalog(datasets(), fh)
+
+    if count == 1:
+        md_content, report_path = gap_report(first_info[0])
+    else:
+        md_content, report_path = gap_summary_report(stats)
     click.echo(md_content)
     click.echo(f"Gap report written to:   {report_path}")
-    click.echo(f"DCAT-US JSON written to: {output_json}")
+    click.echo(f"DCAT-US JSON written to: {output_json} ({count} records)")
 
 
 if __name__ == "__main__":
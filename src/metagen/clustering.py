@@ -0,0 +1,203 @@
+"""Near-duplicate service clustering — one AI gap fill per group of similar services.
+
+Corpora such as EDW publish many services that differ only by a version
+suffix (_01, _02) or a layer subset, and share their descriptions and
+contacts. Each service is reduced to a set of features (name trigrams,
+description words, layer names, author/copyright text), summarised by a
+MinHash signature computed with NumPy, and grouped by locality-sensitive
+hashing. Services only cluster with others from the same host and
+publisher, so organisation-level answers never cross agencies. Only the
+first service in each cluster is sent to the LLM; its organisation-level
+answers are copied to the other members, which make no LLM request.
+"""
+
+import hashlib
+import re
+from collections import Counter
+from collections.abc import Sequence
+
+import numpy as np
+
+from metagen.records import AiResult, RestEnrichment, ServiceInfo
+
+# Gap fields that describe the publishing organisation rather than the
+# dataset, and so are safe to copy between near-duplicate services
+SHARED_FIELDS = ("contactPoint", "license", "bureauCode", "programCode")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SUFFIX_RE = re.compile(r"(?:_MapServer|_FeatureServer|_\d{1,3})+$", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_name(service_name: str) -> str:
+    """Lowercase a service name and drop version suffixes, e.g. "EDW_Roads_02" → "edw_roads"."""
+    return _SUFFIX_RE.sub("", service_name).lower()
+
+
+def service_features(info: ServiceInfo, rest_info: RestEnrichment | None = None) -> set[str]:
+    """Feature set used to compare services: name trigrams plus REST text and layer names."""
+    name = f" {normalize_name(info.service_name)} "
+    features = {f"n:{name[i:i + 3]}" for i in range(len(name) - 2)}
+    if rest_info is not None:
+        text = " ".join(filter(None, (rest_info.service_description, rest_info.description)))
+        features.update(f"w:{word}" for word in _WORD_RE.findall(text.lower()))
+        for label, value in (("a", rest_info.document_author), ("c", rest_info.copyright_text)):
+            if value:
+                features.add(f"{label}:{value.strip().lower()}")
+        if rest_info.layers is not None:
+            features.update(f"l:{layer.lower()}" for layer in rest_info.layers.names)
+    return features
+
+
+def organisation_key(info: ServiceInfo) -> bytes:
+    """Hard clustering key: services with different domains or publishers never cluster."""
+    return f"{info.domain or ''}\x00{info.publisher_name or ''}\x00".encode("utf-8")
+
+
+def cluster_shard_key(info: ServiceInfo) -> str:
+    """Shard key that keeps versions of one service (X_01, X_02) in the same shard.
+
+    Used instead of the endpoint URL when sharding with clustering on.
+    Near-duplicates whose names differ after normalize_name() can still
+    land in different shards and are then not clustered together.
+    """
+    return organisation_key(info).decode("utf-8") + normalize_name(info.service_name)
+
+
+def _feature_hashes(features: set[str]) -> np.ndarray:
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest(), "big")
+            for f in sorted(features)
+        ),
+        dtype=np.uint64,
+        count=len(features),
+    )
+
+
+def minhash_signatures(feature_sets: Sequence[set[str]], num_perm: int = 128) -> np.ndarray:
+    """Return a (len(feature_sets), num_perm) array of MinHash signatures.
+
+    Permutations are universal hashes (a·x + b) mod p with fixed seeds, so
+    signatures are identical across runs and machines. An empty feature
+    set gets an all-max signature, which matches nothing.
+    """
+    rng = np.random.default_rng(0x6D65746167656E)
+    a = rng.integers(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+    signatures = np.full((len(feature_sets), num_perm), _MAX_HASH, dtype=np.uint64)
+    for i, features in enumerate(feature_sets):
+        if not features:
+            continue
+        hashes = _feature_hashes(features)
+        # a, x < 2**32 so a·x + b fits in uint64 before the modulus
+        permuted = (np.outer(hashes, a) + b) % _MERSENNE_PRIME & _MAX_HASH
+        signatures[i] = permuted.min(axis=0)
+    return signatures
+
+
+def cluster_services(
+    services: Sequence[tuple[ServiceInfo, RestEnrichment | None]],
+    threshold: float = 0.8,
+    num_perm: int = 128,
+    bands: int = 16,
+) -> list[int]:
+    """Group near-duplicate services by estimated Jaccard similarity.
+
+    Signatures are split into *bands*; services with the same
+    organisation_key() sharing any band are candidates, and a candidate
+    joins the cluster of the first service in its bucket when their
+    signatures agree on at least *threshold* of positions. Clusters are
+    closed transitively.
+
+    Args:
+        services: (info, rest_info) pairs for the whole corpus
+        threshold: minimum estimated Jaccard similarity to merge two services
+        num_perm: MinHash signature length (must be divisible by bands)
+        bands: LSH bands; more bands find lower-similarity candidates
+
+    Returns:
+        For each service, the index of its cluster representative (the
+        earliest service in the cluster; a service on its own maps to itself).
+    """
+    feature_sets = [service_features(info, rest) for info, rest in services]
+    org_keys = [organisation_key(info) for info, _rest in services]
+    signatures = minhash_signatures(feature_sets, num_perm)
+    rows = num_perm // bands
+
+    parent = list(range(len(services)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets: dict[bytes, int] = {}
+        for i, signature in enumerate(signatures):
+            if not feature_sets[i]:
+                continue
+            # The organisation prefix partitions buckets, so cross-agency pairs never meet
+            key = org_keys[i] + signature[band * rows:(band + 1) * rows].tobytes()
+            head = buckets.setdefault(key, i)
+            if head == i or find(head) == find(i):
+                continue
+            if np.mean(signatures[head] == signature) >= threshold:
+                low, high = sorted((find(head), find(i)))
+                parent[high] = low
+
+    return [find(i) for i in range(len(services))]
+
+
+def shared_values(ai_results: AiResult) -> AiResult:
+    """Copy only the SHARED_FIELDS of a representative's AI result."""
+    return AiResult.from_dict({
+        name: value
+        for name in SHARED_FIELDS
+        if (value := ai_results.get(name)) is not None
+    })
+
+
+class SharedValues:
+    """Hands each cluster representative's SHARED_FIELDS to the rest of its cluster.
+
+    Services are visited in input order, so a representative (the earliest
+    service of its cluster) is always added before its members take its
+    values. A cluster's values are dropped once its last member has taken
+    them, so only clusters still in progress are held in memory.
+    """
+
+    __slots__ = ("_representatives", "_remaining", "_values", "members")
+
+    def __init__(self, representatives: Sequence[int]):
+        self._representatives = representatives
+        self._remaining = Counter(representatives)
+        self._values: dict[int, tuple[str, AiResult]] = {}
+        self.members = 0  # services that took shared values instead of an LLM request
+
+    def is_member(self, index: int) -> bool:
+        """True if service *index* belongs to an earlier service's cluster."""
+        return self._representatives[index] != index
+
+    def add(self, index: int, name: str, ai_results: AiResult) -> None:
+        """Record representative *index*'s answers for the members still to come."""
+        if self._remaining[index] > 1:
+            self._values[index] = (name, shared_values(ai_results))
+        self._release(index)
+
+    def take(self, index: int) -> tuple[str, AiResult]:
+        """Return (representative name, shared values) for member *index*."""
+        representative = self._representatives[index]
+        name, values = self._values[representative]
+        self.members += 1
+        self._release(representative)
+        return name, values
+
+    def _release(self, representative: int) -> None:
+        self._remaining[representative] -= 1
+        if not self._remaining[representative]:
+            del self._remaining[representative]
+            self._values.pop(representative, None)
@@ -25,11 +25,15 @@ class VerdeBot:
     def __init__(self):
         pass
 
-    def chat(self, message):
+    def chat(self, message, max_tokens=None, timeout=None):
+        options = {} if max_tokens is None else {"max_tokens": max_tokens}
+        if timeout is not None:
+            options["request_timeout"] = timeout
         llm = ChatLiteLLM(
             model=f"litellm_proxy/{VERDE_MODEL}",
             api_key=VERDE_API_KEY,
-            api_base=VERDE_URL)
+            api_base=VERDE_URL,
+            **options)
         response = llm.invoke(message)
         return response
 
@@ -5,9 +5,15 @@ import json
 import os
 import re
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from dotenv import load_dotenv
 
+from metagen.metadata.dcat_us import validate_gap_fields
+from metagen.records import GAP_FIELDS, AiResult, RestEnrichment, ServiceInfo
+
 load_dotenv()
 
 DEFAULT_MODEL = "claude-sonnet-4-5-20250929"
@@ -40,34 +46,82 @@ in the WSDL or REST metadata, but do not fabricate values. Save the \
 recommendations in the report in a "suggestions" section.
 """
 
-_EXPECTED_FIELDS = {
-    "description", "modified", "contactPoint", "bureauCode",
-    "programCode", "license", "spatial", "temporal", "theme",
+_EXPECTED_FIELDS = set(GAP_FIELDS)
+
+# Expected value format per field, quoted back to the model in repair requests
+_FIELD_FORMATS = {
+    "description": '"string — a human-readable description of the dataset"',
+    "modified": '"string — ISO 8601 date (YYYY-MM-DD) when last updated"',
+    "contactPoint": '{"fn": "contact name", "hasEmail": "mailto: URI"}',
+    "bureauCode": '["OMB bureau code in NNN:NN format"]',
+    "programCode": '["OMB program code in NNN:NNN format"]',
+    "license": '"string — URL for the license"',
+    "spatial": '"string — xmin,ymin,xmax,ymax in WGS84"',
+    "temporal": '"string — ISO 8601 interval (YYYY-MM-DD/YYYY-MM-DD or R/YYYY-MM-DD/P1Y)"',
+    "theme": '["ISO 19115 topic category, e.g. environment, biota, inlandWaters"]',
 }
 
+# Output cap for a full Claude answer; verde requests are uncapped
+MAX_TOKENS = 2048
+
+# Repair answers only cover the failing fields, so their output is capped
+# per field (value plus confidence entry)
+REPAIR_TOKENS_PER_FIELD = 256
+
+# Per-request timeout (seconds) for both bots. A hedged request that loses
+# the race cannot be interrupted, so this bounds how long it keeps running.
+REQUEST_TIMEOUT = float(os.environ.get("METAGEN_REQUEST_TIMEOUT", "60"))
+
+# Threads shared by all hedged requests; bounds how many requests (including
+# losers still in flight) can be open against the backends at once
+HEDGE_WORKERS = 4
+
+_hedge_executor: ThreadPoolExecutor | None = None
+_hedge_executor_lock = threading.Lock()
+
 _BOT_MODEL_ENV = {
     "verde": "VERDE_MODEL",
     "claude": "METAGEN_MODEL",
 }
 
 
-def build_gap_fill_prompt(wsdl_info: dict, rest_info: dict | None) -> str:
-    """Construct the user message for the LLM API call."""
+def build_evidence(wsdl_info: ServiceInfo, rest_info: RestEnrichment | None) -> str:
+    """Render the source data section shared by gap-fill and repair prompts."""
     rest_section = (
-        json.dumps(rest_info, indent=2, default=str)
+        json.dumps(rest_info.to_dict(), indent=2, default=str)
         if rest_info
         else "REST endpoint metadata was unavailable."
     )
-
     return f"""\
 ## Source Data: ESRI ArcGIS MapServer WSDL
 
 ### WSDL Extracted Information
-{json.dumps(wsdl_info, indent=2, default=str)}
+{json.dumps(wsdl_info.to_dict(), indent=2, default=str)}
 
 ### ArcGIS REST Endpoint Metadata
 {rest_section}
+"""
+
 
+def build_gap_fill_prompt(
+    wsdl_info: ServiceInfo,
+    rest_info: RestEnrichment | None,
+    skip_fields: frozenset[str] = frozenset(),
+) -> str:
+    """Construct the user message for the LLM API call.
+
+    Fields in skip_fields have already been determined locally; the model
+    is told to leave them out.
+    """
+    skip_note = (
+        f"\n\nThese fields are already determined — omit them from your answer: "
+        f"{', '.join(sorted(skip_fields))}."
+        if skip_fields
+        else ""
+    )
+
+    return f"""\
+{build_evidence(wsdl_info, rest_info)}
 ## Required Output
 
 Provide a JSON object with these exact keys. Each value must conform to \
@@ -100,15 +154,54 @@ in a separate "confidence" key:
 }}
 
 Return a single JSON object containing both the field values and the \
-confidence object. No markdown fences or extra text.\
+confidence object. No markdown fences or extra text.{skip_note}\
 """
 
 
-def parse_ai_response(response_text: str) -> tuple[dict, dict]:
+def build_repair_prompt(problems: dict[str, str], evidence: str) -> str:
+    """Construct a stand-alone request for only the given fields.
+
+    The repair is sent as a fresh conversation holding the source evidence
+    and the failing fields, without the original instructions or the
+    previous full answer.
+
+    Args:
+        problems: field name → problem, as returned by validate_gap_fields()
+        evidence: source data section from build_evidence()
+    """
+    issues = "\n".join(f"- {name}: {problem}" for name, problem in problems.items())
+    formats = ",\n".join(f'  "{name}": {_FIELD_FORMATS[name]}' for name in problems)
+    return f"""\
+{evidence}
+## Required Output
+
+An earlier answer for this service had missing or invalid values for these fields:
+{issues}
+
+Return a JSON object containing ONLY these keys, corrected to the expected \
+format, plus a "confidence" object for the same keys:
+{{
+{formats}
+}}
+
+Use "INSUFFICIENT_EVIDENCE" if the evidence does not support a value. \
+No markdown fences or extra text.\
+"""
+
+
+def parse_ai_response(
+    response_text: str,
+    expected: set[str] | None = None,
+) -> tuple[dict, dict]:
     """Parse the LLM's JSON response into field values and confidence.
 
     Strips markdown code fences if present. Warns on missing expected fields.
 
+    Args:
+        response_text: raw model output
+        expected: field names the response should contain; defaults to all
+                  nine gap fields (repair responses cover fewer)
+
     Returns:
         (values_dict, confidence_dict). On parse failure returns ({}, {}).
     """
@@ -129,10 +222,13 @@ def parse_ai_response(response_text: str) -> tuple[dict, dict]:
         print("Warning: AI response is not a JSON object.", file=sys.stderr)
         return {}, {}
 
+    expected = _EXPECTED_FIELDS if expected is None else expected
     confidence = data.pop("confidence", {})
-    values = {k: v for k, v in data.items() if k in _EXPECTED_FIELDS}
+    if not isinstance(confidence, dict):
+        confidence = {}
+    values = {k: v for k, v in data.items() if k in expected}
 
-    missing = _EXPECTED_FIELDS - set(values.keys())
+    missing = expected - set(values.keys())
     if missing:
         print(
             f"Warning: AI response missing fields: {', '.join(sorted(missing))}",
@@ -153,67 +249,267 @@ def _get_anthropic_client():
         return None
     try:
         import anthropic
-        return anthropic.Anthropic(api_key=api_key)
+        return anthropic.Anthropic(api_key=api_key, timeout=REQUEST_TIMEOUT)
     except Exception as e:
         print(f"Warning: Could not initialize Anthropic client: {e}", file=sys.stderr)
         return None
 
 
+def repair_max_tokens(problems: dict[str, str], fields: tuple[str, ...]) -> int | None:
+    """Output cap for a repair round asking for *problems*.
+
+    When every requested field failed (e.g. the first answer was not valid
+    JSON) the repair is as large as the original request, so it gets the
+    same cap (None). Otherwise the cap scales with the number of fields.
+    """
+    if set(fields) <= set(problems):
+        return None
+    return min(MAX_TOKENS, REPAIR_TOKENS_PER_FIELD * len(problems))
+
+
+def _call_bot(
+    bot: str,
+    conversation: list[tuple[str, str]],
+    max_tokens: int | None = None,
+) -> tuple[str, str]:
+    """Send a gap-fill conversation to *bot*.
+
+    Args:
+        bot: "verde" or "claude"
+        conversation: (role, content) turns after the system prompt, where
+                      role is "human" or "ai"
+        max_tokens: output token cap; None leaves verde uncapped and uses
+                    MAX_TOKENS for claude
+
+    Returns (response_text, model_name). Raises on any failure, including
+    a missing API key.
+    """
+    if bot == "verde":
+        from metagen.llm.bots import VerdeBot
+        response = VerdeBot().chat(
+            [("system", DCAT_SYSTEM_PROMPT), *conversation],
+            max_tokens=max_tokens,
+            timeout=REQUEST_TIMEOUT,
+        )
+        return response.content, os.environ.get("VERDE_MODEL", "unknown")
+
+    # claude
+    client = _get_anthropic_client()
+    if client is None:
+        raise RuntimeError("No API key")
+    model_name = os.environ.get("METAGEN_MODEL", DEFAULT_MODEL)
+    response = client.messages.create(
+        model=model_name,
+        max_tokens=max_tokens or MAX_TOKENS,
+        system=DCAT_SYSTEM_PROMPT,
+        messages=[
+            {"role": "user" if role == "human" else "assistant", "content": content}
+            for role, content in conversation
+        ],
+    )
+    return response.content[0].text, model_name
+
+
+def _attempt(
+    bot: str,
+    user_message: str,
+    evidence: str,
+    max_repairs: int = 1,
+    fields: tuple[str, ...] = tuple(GAP_FIELDS),
+) -> tuple[dict, dict, str, dict]:
+    """Call *bot*, then re-ask only for missing or invalid fields.
+
+    Each repair round is a new single-message request holding the source
+    evidence and the failing fields (see build_repair_prompt). Input cost
+    per round is therefore about the size of the evidence and does not grow
+    with the number of rounds; output is capped by repair_max_tokens().
+    Values still invalid after max_repairs rounds are dropped rather than
+    written to the catalog.
+
+    Returns (values, confidence, model_name, repair_metadata). Raises
+    unless at least one usable value was obtained.
+    """
+    response_text, model_name = _call_bot(bot, [("human", user_message)])
+    values, confidence = parse_ai_response(response_text, expected=set(fields))
+    problems = validate_gap_fields(values, fields)
+    initial_problems = set(problems)
+
+    rounds = 0
+    while problems and rounds < max_repairs:
+        rounds += 1
+        repair_message = build_repair_prompt(problems, evidence)
+        response_text, _ = _call_bot(
+            bot, [("human", repair_message)], max_tokens=repair_max_tokens(problems, fields)
+        )
+        fixes, fix_confidence = parse_ai_response(response_text, expected=set(problems))
+        for name in problems:
+            if name in fixes:
+                values[name] = fixes[name]
+            if name in fix_confidence:
+                confidence[name] = fix_confidence[name]
+        problems = validate_gap_fields(values, fields)
+
+    for name in problems:
+        values.pop(name, None)
+    if not values:
+        raise RuntimeError("Failed to parse AI response")
+
+    repair = {
+        "rounds": rounds,
+        "repaired": sorted(initial_problems - set(problems)),
+        "unresolved": problems,
+    }
+    return values, confidence, model_name, repair
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """Return the module-wide pool used for hedged requests, creating it on first use."""
+    global _hedge_executor
+    with _hedge_executor_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=HEDGE_WORKERS, thread_name_prefix="metagen-hedge"
+            )
+        return _hedge_executor
+
+
+def _hedged_attempt(
+    bot: str,
+    hedge_bot: str,
+    user_message: str,
+    evidence: str,
+    hedge_after: float,
+    max_repairs: int = 1,
+    fields: tuple[str, ...] = tuple(GAP_FIELDS),
+) -> tuple[str, tuple[dict, dict, str, dict] | None, dict]:
+    """Race *bot* against *hedge_bot* and return the first usable answer.
+
+    The hedge request is only sent once *bot* has gone hedge_after seconds
+    without a usable answer, or as soon as it fails. The losing request is
+    cancelled if it has not started; a request already in flight cannot be
+    interrupted, so it runs until it answers or hits REQUEST_TIMEOUT and
+    its answer is discarded. Both requests run on a shared pool of
+    HEDGE_WORKERS threads, so losers cannot pile up without limit across
+    services.
+
+    Returns (winner, _attempt() result or None, hedge_metadata).
+    """
+    executor = _get_hedge_executor()
+    start = time.monotonic()
+    pending = {executor.submit(_attempt, bot, user_message, evidence, max_repairs, fields): bot}
+    hedged = False
+    errors: dict[str, str] = {}
+    winner, result = "", None
+
+    try:
+        while pending:
+            timeout = None if hedged else max(0.0, hedge_after - (time.monotonic() - start))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+                    continue
+                winner = name
+                break
+            if result is not None:
+                break
+            if not hedged:
+                # Primary is slow (timeout) or has failed — fire the hedge
+                hedged = True
+                pending[executor.submit(
+                    _attempt, hedge_bot, user_message, evidence, max_repairs, fields
+                )] = hedge_bot
+    finally:
+        for future in pending:
+            future.cancel()
+
+    hedge = {
+        "primary": bot,
+        "secondary": hedge_bot,
+        "hedged": hedged,
+        "winner": winner or None,
+        "latency": round(time.monotonic() - start, 3),
+    }
+    if errors:
+        hedge["errors"] = errors
+    return winner, result, hedge
+
+
 def ai_gap_fill(
-    wsdl_info: dict,
-    rest_info: dict | None = None,
+    wsdl_info: ServiceInfo,
+    rest_info: RestEnrichment | None = None,
     bot: str = "verde",
-) -> tuple[dict, dict]:
+    hedge_bot: str | None = None,
+    hedge_after: float = 10.0,
+    max_repairs: int = 1,
+    skip_fields: frozenset[str] = frozenset(),
+) -> tuple[AiResult, dict]:
     """Suggest values for DCAT-US gap fields using the selected bot.
 
+    Fields that come back missing or fail the DCAT-US format checks are
+    re-requested in a short follow-up message, up to max_repairs times.
+
+    With hedge_bot set, the same request is also sent to hedge_bot if *bot*
+    has not produced a parseable answer within hedge_after seconds (or has
+    failed), and the first parseable answer wins. This bounds per-service
+    latency when one backend is slow.
+
     Args:
-        wsdl_info: metadata dict from readers.wsdl.parse_wsdl()
-        rest_info: optional enrichment dict from readers.rest.extract_enrichment()
+        wsdl_info: ServiceInfo from readers.wsdl.parse_wsdl()
+        rest_info: optional RestEnrichment from readers.rest.extract_enrichment()
         bot: which bot to use — "verde" (default) or "claude"
+        hedge_bot: optional secondary bot to hedge with
+        hedge_after: seconds to wait on *bot* before firing hedge_bot
+        max_repairs: follow-up rounds allowed for missing/invalid fields
+        skip_fields: gap fields already resolved elsewhere (e.g. "theme" from
+                     metadata.themes.classify_corpus); not requested or validated
 
     Returns:
         (ai_results, ai_metadata) where:
-          ai_results  — dict mapping DCAT-US field names to suggested values
-          ai_metadata — dict with keys: source, bot, model, error, confidence
+          ai_results  — AiResult holding the suggested gap field values
+          ai_metadata — dict with keys: source, bot, model, error, confidence,
+                        latency, repair, and hedge (when hedging was enabled)
     """
-    user_message = build_gap_fill_prompt(wsdl_info, rest_info)
+    user_message = build_gap_fill_prompt(wsdl_info, rest_info, skip_fields)
+    evidence = build_evidence(wsdl_info, rest_info)
+    fields = tuple(name for name in GAP_FIELDS if name not in skip_fields)
 
-    if bot == "verde":
-        from metagen.llm.bots import VerdeBot
-        try:
-            response = VerdeBot().chat([
-                ("system", DCAT_SYSTEM_PROMPT),
-                ("human", user_message),
-            ])
-            response_text = response.content
-        except Exception as e:
-            return {}, {"source": "fallback", "bot": bot, "error": str(e)}
-        model_name = os.environ.get("VERDE_MODEL", "unknown")
-
-    else:  # claude
-        client = _get_anthropic_client()
-        if client is None:
-            return {}, {"source": "fallback", "bot": bot, "error": "No API key"}
-        model_name = os.environ.get("METAGEN_MODEL", DEFAULT_MODEL)
-        try:
-            response = client.messages.create(
-                model=model_name,
-                max_tokens=2048,
-                system=DCAT_SYSTEM_PROMPT,
-                messages=[{"role": "user", "content": user_message}],
-            )
-            response_text = response.content[0].text
-        except Exception as e:
-            return {}, {"source": "fallback", "bot": bot, "error": str(e)}
-
-    values, confidence = parse_ai_response(response_text)
-
-    if not values:
-        return {}, {"source": "fallback", "bot": bot, "error": "Failed to parse AI response"}
+    if hedge_bot and hedge_bot != bot:
+        winner, result, hedge = _hedged_attempt(
+            bot, hedge_bot, user_message, evidence, hedge_after, max_repairs, fields
+        )
+        if result is None:
+            error = "; ".join(f"{name}: {err}" for name, err in hedge.get("errors", {}).items())
+            return AiResult(), {
+                "source": "fallback", "bot": bot, "error": error, "hedge": hedge,
+            }
+        values, confidence, model_name, repair = result
+        return AiResult.from_dict(values), {
+            "source": "ai",
+            "bot": winner,
+            "model": model_name,
+            "confidence": confidence,
+            "latency": hedge["latency"],
+            "repair": repair,
+            "hedge": hedge,
+        }
+
+    start = time.monotonic()
+    try:
+        values, confidence, model_name, repair = _attempt(
+            bot, user_message, evidence, max_repairs, fields
+        )
+    except Exception as e:
+        return AiResult(), {"source": "fallback", "bot": bot, "error": str(e)}
 
-    return values, {
+    return AiResult.from_dict(values), {
         "source": "ai",
         "bot": bot,
         "model": model_name,
         "confidence": confidence,
+        "latency": round(time.monotonic() - start, 3),
+        "repair": repair,
     }
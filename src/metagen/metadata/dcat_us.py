@@ -1,105 +1,204 @@
 """DCAT-US serializer — builds a DCAT-US data.json catalog record from extracted metadata."""
 
 import json
+import re
+from collections.abc import Iterable
+from typing import IO
 
-PLACEHOLDER = "[[REQUIRED — provide manually]]"
-INSUFFICIENT = "INSUFFICIENT_EVIDENCE"
+from metagen.metadata.model import (
+    INSUFFICIENT,
+    ISO_TOPIC_CATEGORIES,
+    MetadataRecord,
+    build_record,
+    parse_bbox,
+)
+from metagen.records import GAP_FIELDS, AiResult, ServiceInfo
 
 
-def _resolve_ai(ai_results: dict | None, field_name: str, default=None):
-    """Return the AI-suggested value if usable, otherwise the placeholder or default."""
-    if ai_results is None:
-        return default if default is not None else PLACEHOLDER
-    val = ai_results.get(field_name)
-    if val is None or val == INSUFFICIENT:
-        return default if default is not None else PLACEHOLDER
-    return val
-
-
-def build_dcat_us(info: dict, ai_results: dict | None = None) -> dict:
-    """Build a DCAT-US data.json catalog record from extracted WSDL info.
-
-    Args:
-        info: metadata dict returned by readers.wsdl.parse_wsdl()
-        ai_results: optional dict of AI-suggested gap field values
-
-    Returns:
-        A dict conforming to the DCAT-US v1.1 catalog schema.
-    """
-    endpoint = info.get("endpoint_url", PLACEHOLDER)
-    service_name = info.get("service_name", "")
-
-    ai_contact = (ai_results or {}).get("contactPoint", {})
-    if isinstance(ai_contact, dict):
-        contact_fn = ai_contact.get("fn", PLACEHOLDER)
-        contact_email = ai_contact.get("hasEmail", PLACEHOLDER)
-        if contact_fn == INSUFFICIENT:
-            contact_fn = PLACEHOLDER
-        if contact_email == INSUFFICIENT:
-            contact_email = PLACEHOLDER
-    else:
-        contact_fn = PLACEHOLDER
-        contact_email = PLACEHOLDER
-
-    # Base keyword list — supplemented from the service name below
-    keywords = ["geospatial", "map service", "ArcGIS"]
-    name_parts = service_name.replace("_MapServer", "").split("_")
-    for part in name_parts:
-        kw = part.lower()
-        if kw and kw not in ("01", "02", "03") and len(kw) > 2:
-            keywords.append(kw)
-
+def dataset_from_record(record: MetadataRecord) -> dict:
+    """Render a MetadataRecord as a DCAT-US dcat:Dataset dict."""
+    distribution = {
+        "@type": "dcat:Distribution",
+        "accessURL": record.access_url,
+        "format": record.distribution_format,
+        "title": record.distribution_title,
+        "description": record.distribution_description,
+        "mediaType": record.distribution_media_type,
+    }
     dataset = {
         "@type": "dcat:Dataset",
-        "title": info.get("title", PLACEHOLDER),
-        "description": _resolve_ai(ai_results, "description"),
-        "keyword": keywords,
-        "modified": _resolve_ai(ai_results, "modified"),
+        "title": record.title,
+        "description": record.description,
+        "keyword": list(record.keywords),
+        "modified": record.modified,
         "publisher": {
             "@type": "org:Organization",
-            "name": info.get("publisher_name", PLACEHOLDER),
+            "name": record.publisher_name,
         },
         "contactPoint": {
             "@type": "vcard:Contact",
-            "fn": contact_fn,
-            "hasEmail": contact_email,
+            "fn": record.contact_fn,
+            "hasEmail": record.contact_email,
         },
-        "identifier": endpoint,
-        "accessLevel": "public",
-        "bureauCode": _resolve_ai(ai_results, "bureauCode", [PLACEHOLDER]),
-        "programCode": _resolve_ai(ai_results, "programCode", [PLACEHOLDER]),
-        "license": _resolve_ai(ai_results, "license"),
-        "spatial": _resolve_ai(ai_results, "spatial"),
-        "temporal": _resolve_ai(ai_results, "temporal"),
-        "theme": _resolve_ai(ai_results, "theme", [PLACEHOLDER]),
-        "distribution": [
-            {
-                "@type": "dcat:Distribution",
-                "accessURL": endpoint,
-                "format": "ESRI SOAP MapServer",
-                "title": f"{service_name} (SOAP endpoint)",
-                "description": (
-                    f"SOAP web service with {len(info.get('operations', []))} "
-                    "operations including ExportMapImage, Find, Identify, "
-                    "QueryFeatureData, and others."
-                ),
-                "mediaType": "application/xml",
-            }
-        ],
+        "identifier": record.identifier,
+        "accessLevel": record.access_level,
+        "bureauCode": record.bureau_code,
+        "programCode": record.program_code,
+        "license": record.license,
+        "spatial": record.spatial,
+        "temporal": record.temporal,
+        "theme": record.theme,
+        "distribution": [{k: v for k, v in distribution.items() if v is not None}],
     }
 
-    if info.get("publisher_subOrganizationOf"):
+    if record.publisher_parent:
         dataset["publisher"]["subOrganizationOf"] = {
             "@type": "org:Organization",
-            "name": info["publisher_subOrganizationOf"],
+            "name": record.publisher_parent,
         }
 
-    catalog = {
+    return dataset
+
+
+def catalog_from_datasets(datasets: list[dict]) -> dict:
+    """Wrap dcat:Dataset dicts in a DCAT-US v1.1 catalog."""
+    return {
         "conformsTo": "https://project-open-data.cio.gov/v1.1/schema",
         "describedBy": "https://project-open-data.cio.gov/v1.1/schema/catalog.json",
         "@context": "https://project-open-data.cio.gov/v1.1/schema/catalog.jsonld",
         "@type": "dcat:Catalog",
-        "dataset": [dataset],
+        "dataset": datasets,
     }
 
-    return catalog
+
+def build_dcat_us(info: ServiceInfo, ai_results: AiResult | None = None) -> dict:
+    """Build a DCAT-US data.json catalog record from extracted WSDL info.
+
+    Args:
+        info: ServiceInfo returned by readers.wsdl.parse_wsdl()
+        ai_results: optional AI-suggested gap field values
+
+    Returns:
+        A dict conforming to the DCAT-US v1.1 catalog schema.
+    """
+    record = build_record(info, ai_results=ai_results)
+    return catalog_from_datasets([dataset_from_record(record)])
+
+
+def write_dcat_us(record: MetadataRecord, fh: IO[bytes]) -> None:
+    """Write a single-dataset DCAT-US catalog for *record* as UTF-8 JSON."""
+    catalog = catalog_from_datasets([dataset_from_record(record)])
+    fh.write(json.dumps(catalog, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+def write_dcat_catalog(datasets: Iterable[dict], fh: IO[bytes]) -> int:
+    """Stream a DCAT-US catalog to *fh*, writing datasets as they arrive.
+
+    Only one dataset is held in memory at a time, so arbitrarily large
+    record streams can be serialized. Returns the number of datasets written.
+    """
+    header = json.dumps(catalog_from_datasets([]), indent=2, ensure_ascii=False)
+    # Split the empty catalog at its "dataset": [] so entries can be spliced in
+    head, tail = header.rsplit("[]", 1)
+    fh.write(head.encode("utf-8") + b"[")
+
+    count = 0
+    for dataset in datasets:
+        body = json.dumps(dataset, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+        fh.write((",\n    " if count else "\n    ").encode("utf-8") + body.encode("utf-8"))
+        count += 1
+
+    fh.write(("\n  ]" if count else "]").encode("utf-8") + tail.encode("utf-8"))
+    return count
+
+
+# ---------------------------------------------------------------------------
+# Gap field validation (DCAT-US v1.1 format rules used in the LLM prompt)
+# ---------------------------------------------------------------------------
+
+_DATE = r"\d{4}(?:-\d{2}(?:-\d{2}(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?)?)?"
+_DURATION = r"P(?=\d|T\d)(?:\d+Y)?(?:\d+M)?(?:\d+W)?(?:\d+D)?(?:T(?:\d+H)?(?:\d+M)?(?:\d+(?:\.\d+)?S)?)?"
+_DATE_RE = re.compile(rf"^{_DATE}$")
+_INTERVAL_RE = re.compile(
+    rf"^(?:R\d*/{_DATE}/{_DURATION}|{_DATE}/(?:{_DATE}|{_DURATION})|{_DURATION}/{_DATE})$"
+)
+_BUREAU_RE = re.compile(r"^\d{3}:\d{2}$")
+_PROGRAM_RE = re.compile(r"^\d{3}:\d{3}$")
+_EMAIL_RE = re.compile(r"^mailto:[^@\s]+@[^@\s]+\.[^@\s]+$")
+_TOPICS = {t.lower() for t in ISO_TOPIC_CATEGORIES}
+
+
+def _check_codes(value, pattern: re.Pattern, label: str) -> str | None:
+    if not isinstance(value, list) or not value:
+        return f"expected a non-empty list of {label} strings"
+    bad = [v for v in value if not (isinstance(v, str) and pattern.match(v))]
+    if bad:
+        return f"invalid {label} value(s): {', '.join(map(str, bad))}"
+    return None
+
+
+def _check_gap_field(name: str, value) -> str | None:
+    """Return a short problem description for one gap field, or None if valid."""
+    if value == INSUFFICIENT:
+        return None
+    if name == "description":
+        if not isinstance(value, str) or not value.strip():
+            return "expected a non-empty string"
+    elif name == "modified":
+        if not isinstance(value, str) or not _DATE_RE.match(value):
+            return "expected an ISO 8601 date (YYYY-MM-DD)"
+    elif name == "contactPoint":
+        if not isinstance(value, dict):
+            return 'expected an object with "fn" and "hasEmail"'
+        fn, email = value.get("fn"), value.get("hasEmail")
+        if not (isinstance(fn, str) and fn.strip()):
+            return '"fn" must be a non-empty string'
+        if email != INSUFFICIENT and not (isinstance(email, str) and _EMAIL_RE.match(email)):
+            return '"hasEmail" must be a mailto: URI'
+    elif name == "bureauCode":
+        return _check_codes(value, _BUREAU_RE, "NNN:NN bureau code")
+    elif name == "programCode":
+        return _check_codes(value, _PROGRAM_RE, "NNN:NNN program code")
+    elif name == "license":
+        if not isinstance(value, str) or not re.match(r"^https?://\S+$", value):
+            return "expected a license URL"
+    elif name == "spatial":
+        bbox = parse_bbox(value)
+        if bbox is None:
+            return 'expected "xmin,ymin,xmax,ymax" in WGS84'
+        xmin, ymin, xmax, ymax = bbox
+        if not (-180 <= xmin <= xmax <= 180 and -90 <= ymin <= ymax <= 90):
+            return "bounding box is out of WGS84 range or has min > max"
+    elif name == "temporal":
+        if not isinstance(value, str) or not _INTERVAL_RE.match(value):
+            return "expected an ISO 8601 interval (YYYY-MM-DD/YYYY-MM-DD or R/YYYY-MM-DD/P1Y)"
+    elif name == "theme":
+        if not isinstance(value, list) or not value:
+            return "expected a non-empty list of ISO 19115 topic categories"
+        bad = [v for v in value if not (isinstance(v, str) and v.lower() in _TOPICS)]
+        if bad:
+            return f"not ISO 19115 topic categories: {', '.join(map(str, bad))}"
+    return None
+
+
+def validate_gap_fields(values: dict, fields=GAP_FIELDS) -> dict[str, str]:
+    """Check DCAT-US gap field values against the format rules.
+
+    "INSUFFICIENT_EVIDENCE" counts as a valid answer.
+
+    Args:
+        values: DCAT-US-keyed dict of field values (e.g. from parse_ai_response)
+        fields: field names to check; defaults to all nine gap fields
+
+    Returns:
+        Mapping of field name to problem for every missing or invalid field.
+    """
+    problems = {}
+    for name in fields:
+        if values.get(name) is None:
+            problems[name] = "missing"
+            continue
+        problem = _check_gap_field(name, values[name])
+        if problem:
+            problems[name] = problem
+    return problems
@@ -0,0 +1,116 @@
+"""FGDC CSDGM serializer — streams an FGDC-STD-001-1998 XML record from a MetadataRecord."""
+
+import re
+from typing import IO
+
+from metagen.metadata.model import (
+    PLACEHOLDER,
+    MetadataRecord,
+    as_list,
+    parse_bbox,
+    split_interval,
+    strip_mailto,
+)
+from metagen.metadata.xml_stream import XmlStream
+
+
+def _fgdc_date(value: str | None) -> str:
+    """Convert an ISO 8601 date (YYYY[-MM[-DD]]) to the CSDGM YYYYMMDD form.
+
+    Values that are not ISO dates (e.g. the placeholder) pass through unchanged.
+    """
+    if not value:
+        return PLACEHOLDER
+    match = re.match(r"^(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?", value)
+    if not match:
+        return value
+    return "".join(part for part in match.groups() if part)
+
+
+def _time_period(xml: XmlStream, record: MetadataRecord) -> None:
+    interval = split_interval(record.temporal)
+    with xml.element("timeperd"):
+        with xml.element("timeinfo"):
+            if interval is None:
+                with xml.element("sngdate"):
+                    xml.leaf("caldate", PLACEHOLDER)
+            else:
+                begin, end = interval
+                with xml.element("rngdates"):
+                    xml.leaf("begdate", _fgdc_date(begin))
+                    xml.leaf("enddate", _fgdc_date(end) if end else "Present")
+        xml.leaf("current", PLACEHOLDER)
+
+
+def _bounding(xml: XmlStream, record: MetadataRecord) -> None:
+    bbox = parse_bbox(record.spatial)
+    with xml.element("spdom"), xml.element("bounding"):
+        if bbox is None:
+            for name in ("westbc", "eastbc", "northbc", "southbc"):
+                xml.leaf(name, PLACEHOLDER)
+        else:
+            xmin, ymin, xmax, ymax = bbox
+            xml.leaf("westbc", repr(xmin))
+            xml.leaf("eastbc", repr(xmax))
+            xml.leaf("northbc", repr(ymax))
+            xml.leaf("southbc", repr(ymin))
+
+
+def _contact(xml: XmlStream, name: str, record: MetadataRecord) -> None:
+    with xml.element(name), xml.element("cntinfo"):
+        with xml.element("cntorgp"):
+            xml.leaf("cntorg", record.publisher_name)
+            xml.leaf("cntper", record.contact_fn)
+        xml.leaf("cntemail", strip_mailto(record.contact_email))
+
+
+def write_fgdc(record: MetadataRecord, fh: IO[bytes]) -> None:
+    """Stream *record* to *fh* as an FGDC CSDGM <metadata> document."""
+    xml = XmlStream(fh)
+    xml.start_document()
+    with xml.element("metadata"):
+        with xml.element("idinfo"):
+            with xml.element("citation"), xml.element("citeinfo"):
+                xml.leaf("origin", record.publisher_name)
+                xml.leaf("pubdate", _fgdc_date(record.modified))
+                xml.leaf("title", record.title)
+                xml.leaf("onlink", record.access_url)
+            with xml.element("descript"):
+                xml.leaf("abstract", record.description)
+                xml.leaf("purpose", PLACEHOLDER)
+            _time_period(xml, record)
+            with xml.element("status"):
+                xml.leaf("progress", PLACEHOLDER)
+                xml.leaf("update", PLACEHOLDER)
+            _bounding(xml, record)
+            with xml.element("keywords"):
+                with xml.element("theme"):
+                    xml.leaf("themekt", "ISO 19115 Topic Category")
+                    for topic in as_list(record.theme):
+                        xml.leaf("themekey", topic)
+                with xml.element("theme"):
+                    xml.leaf("themekt", "None")
+                    for kw in record.keywords:
+                        xml.leaf("themekey", kw)
+            xml.leaf("accconst", "None" if record.access_level == "public" else record.access_level)
+            xml.leaf("useconst", record.license)
+            _contact(xml, "ptcontac", record)
+
+        with xml.element("distinfo"):
+            with xml.element("distrib"), xml.element("cntinfo"), xml.element("cntorgp"):
+                xml.leaf("cntorg", record.publisher_name)
+            # digform requires a format name; without one the linkage stays in citeinfo/onlink
+            if record.distribution_format:
+                with xml.element("stdorder"), xml.element("digform"):
+                    with xml.element("digtinfo"):
+                        xml.leaf("formname", record.distribution_format)
+                    with xml.element("digtopt"), xml.element("onlinopt"), xml.element("computer"):
+                        with xml.element("networka"):
+                            xml.leaf("networkr", record.access_url)
+
+        with xml.element("metainfo"):
+            xml.leaf("metd", _fgdc_date(record.modified))
+            _contact(xml, "metc", record)
+            xml.leaf("metstdn", "FGDC Content Standard for Digital Geospatial Metadata")
+            xml.leaf("metstdv", "FGDC-STD-001-1998")
+    xml.end_document()
@@ -0,0 +1,123 @@
+"""ISO 19115 serializer — streams an ISO 19139 (gmd) XML record from a MetadataRecord."""
+
+from typing import IO
+
+from metagen.metadata.model import (
+    PLACEHOLDER,
+    MetadataRecord,
+    as_list,
+    parse_bbox,
+    split_interval,
+    strip_mailto,
+)
+from metagen.metadata.xml_stream import XmlStream
+
+_NAMESPACES = {
+    "xmlns:gmd": "http://www.isotc211.org/2005/gmd",
+    "xmlns:gco": "http://www.isotc211.org/2005/gco",
+    "xmlns:gml": "http://www.opengis.net/gml/3.2",
+}
+
+_CODELISTS = "http://standards.iso.org/iso/19139/resources/gmxCodelists.xml"
+
+
+def _char(xml: XmlStream, name: str, text: str) -> None:
+    """Write <name><gco:CharacterString>text</gco:CharacterString></name>."""
+    with xml.element(name):
+        xml.leaf("gco:CharacterString", text)
+
+
+def _code(xml: XmlStream, name: str, code_list: str, value: str) -> None:
+    with xml.element(name):
+        xml.leaf(
+            f"gmd:{code_list}",
+            value,
+            {"codeList": f"{_CODELISTS}#{code_list}", "codeListValue": value},
+        )
+
+
+def _contact(xml: XmlStream, record: MetadataRecord) -> None:
+    with xml.element("gmd:CI_ResponsibleParty"):
+        _char(xml, "gmd:individualName", record.contact_fn)
+        _char(xml, "gmd:organisationName", record.publisher_name)
+        with xml.element("gmd:contactInfo"), xml.element("gmd:CI_Contact"):
+            with xml.element("gmd:address"), xml.element("gmd:CI_Address"):
+                _char(xml, "gmd:electronicMailAddress", strip_mailto(record.contact_email))
+        _code(xml, "gmd:role", "CI_RoleCode", "pointOfContact")
+
+
+def _extent(xml: XmlStream, record: MetadataRecord) -> None:
+    bbox = parse_bbox(record.spatial)
+    interval = split_interval(record.temporal)
+    if bbox is None and interval is None:
+        return
+    with xml.element("gmd:extent"), xml.element("gmd:EX_Extent"):
+        if bbox is not None:
+            xmin, ymin, xmax, ymax = bbox
+            with xml.element("gmd:geographicElement"), xml.element("gmd:EX_GeographicBoundingBox"):
+                for name, value in (
+                    ("gmd:westBoundLongitude", xmin),
+                    ("gmd:eastBoundLongitude", xmax),
+                    ("gmd:southBoundLatitude", ymin),
+                    ("gmd:northBoundLatitude", ymax),
+                ):
+                    with xml.element(name):
+                        xml.leaf("gco:Decimal", repr(value))
+        if interval is not None:
+            begin, end = interval
+            with xml.element("gmd:temporalElement"), xml.element("gmd:EX_TemporalExtent"):
+                with xml.element("gmd:extent"), xml.element("gml:TimePeriod", {"gml:id": "temporal"}):
+                    xml.leaf("gml:beginPosition", begin)
+                    if end:
+                        xml.leaf("gml:endPosition", end)
+                    else:
+                        xml.leaf("gml:endPosition", None, {"indeterminatePosition": "now"})
+
+
+def write_iso19115(record: MetadataRecord, fh: IO[bytes]) -> None:
+    """Stream *record* to *fh* as an ISO 19139 gmd:MD_Metadata document."""
+    xml = XmlStream(fh)
+    xml.start_document()
+    with xml.element("gmd:MD_Metadata", _NAMESPACES):
+        _char(xml, "gmd:fileIdentifier", record.identifier)
+        _char(xml, "gmd:language", "eng")
+        _code(xml, "gmd:hierarchyLevel", "MD_ScopeCode", "service")
+        with xml.element("gmd:contact"):
+            _contact(xml, record)
+        with xml.element("gmd:dateStamp"):
+            xml.leaf("gco:Date", record.modified)
+        _char(xml, "gmd:metadataStandardName", "ISO 19115:2003/19139")
+
+        with xml.element("gmd:identificationInfo"), xml.element("gmd:MD_DataIdentification"):
+            with xml.element("gmd:citation"), xml.element("gmd:CI_Citation"):
+                _char(xml, "gmd:title", record.title)
+                with xml.element("gmd:date"), xml.element("gmd:CI_Date"):
+                    with xml.element("gmd:date"):
+                        xml.leaf("gco:Date", record.modified)
+                    _code(xml, "gmd:dateType", "CI_DateTypeCode", "revision")
+                for code in as_list(record.bureau_code) + as_list(record.program_code):
+                    if code == PLACEHOLDER:
+                        continue
+                    with xml.element("gmd:identifier"), xml.element("gmd:MD_Identifier"):
+                        _char(xml, "gmd:code", code)
+            _char(xml, "gmd:abstract", record.description)
+            with xml.element("gmd:descriptiveKeywords"), xml.element("gmd:MD_Keywords"):
+                for kw in record.keywords:
+                    _char(xml, "gmd:keyword", kw)
+            with xml.element("gmd:resourceConstraints"), xml.element("gmd:MD_LegalConstraints"):
+                _char(xml, "gmd:otherConstraints", record.license)
+            _char(xml, "gmd:language", "eng")
+            for topic in as_list(record.theme):
+                with xml.element("gmd:topicCategory"):
+                    xml.leaf("gmd:MD_TopicCategoryCode", topic)
+            _extent(xml, record)
+
+        with xml.element("gmd:distributionInfo"), xml.element("gmd:MD_Distribution"):
+            with xml.element("gmd:transferOptions"), xml.element("gmd:MD_DigitalTransferOptions"):
+                with xml.element("gmd:onLine"), xml.element("gmd:CI_OnlineResource"):
+                    with xml.element("gmd:linkage"):
+                        xml.leaf("gmd:URL", record.access_url)
+                    if record.distribution_format:
+                        _char(xml, "gmd:protocol", record.distribution_format)
+                    _char(xml, "gmd:name", record.distribution_title)
+    xml.end_document()
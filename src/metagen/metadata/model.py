@@ -0,0 +1,265 @@
+"""Intermediate metadata model — a standard-neutral record filled once per service.
+
+The record is resolved from the extracted WSDL info and any AI suggestions a
+single time; each output writer (DCAT-US, ISO 19115, FGDC) renders from it
+without re-running the parse/fetch/LLM pipeline.
+"""
+
+import re
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+
+from metagen.records import AiResult, ServiceInfo, ThemeResult
+
+PLACEHOLDER = "[[REQUIRED — provide manually]]"
+INSUFFICIENT = "INSUFFICIENT_EVIDENCE"
+
+# ISO 19115 MD_TopicCategoryCode values, the vocabulary for DCAT-US "theme"
+ISO_TOPIC_CATEGORIES = (
+    "farming", "biota", "boundaries", "climatologyMeteorologyAtmosphere",
+    "economy", "elevation", "environment", "geoscientificInformation",
+    "health", "imageryBaseMapsEarthCover", "intelligenceMilitary",
+    "inlandWaters", "location", "oceans", "planningCadastre", "society",
+    "structure", "transportation", "utilitiesCommunication",
+)
+
+# Distribution defaults for WSDL input; records read from FGDC / ISO metadata
+# describe the source's online linkage instead and make no format claim
+DISTRIBUTION_FORMAT = "ESRI SOAP MapServer"
+DISTRIBUTION_MEDIA_TYPE = "application/xml"
+
+
+def _resolve_ai(ai_results: AiResult | None, field_name: str, default=None):
+    """Return the AI-suggested value if usable, otherwise the placeholder or default."""
+    if ai_results is None:
+        return default if default is not None else PLACEHOLDER
+    val = ai_results.get(field_name)
+    if val is None or val == INSUFFICIENT:
+        return default if default is not None else PLACEHOLDER
+    return val
+
+
+@dataclass
+class MetadataRecord:
+    """Standard-neutral metadata for one service.
+
+    Unresolved required values hold PLACEHOLDER. List-valued fields keep
+    whatever shape the AI returned so DCAT-US output is unchanged; XML
+    writers normalise them with as_list().
+    """
+
+    title: str
+    identifier: str
+    service_name: str
+    description: str = PLACEHOLDER
+    keywords: list[str] = field(default_factory=list)
+    modified: str = PLACEHOLDER
+    publisher_name: str = PLACEHOLDER
+    publisher_parent: str | None = None
+    contact_fn: str = PLACEHOLDER
+    contact_email: str = PLACEHOLDER
+    access_level: str = "public"
+    bureau_code: list[str] | str = field(default_factory=lambda: [PLACEHOLDER])
+    program_code: list[str] | str = field(default_factory=lambda: [PLACEHOLDER])
+    license: str = PLACEHOLDER
+    spatial: str = PLACEHOLDER
+    temporal: str = PLACEHOLDER
+    theme: list[str] | str = field(default_factory=lambda: [PLACEHOLDER])
+    access_url: str = PLACEHOLDER
+    distribution_title: str = ""
+    distribution_description: str = ""
+    distribution_format: str | None = None
+    distribution_media_type: str | None = None
+
+
+def _distribution(info: ServiceInfo) -> dict:
+    """Distribution title, description, format and media type for *info*."""
+    if info.source_standard:
+        return {
+            "distribution_title": f"{info.title or info.service_name} (online linkage)",
+            "distribution_description": (
+                f"Online linkage recorded in the source {info.source_standard} metadata."
+            ),
+        }
+    return {
+        "distribution_title": f"{info.service_name} (SOAP endpoint)",
+        "distribution_description": (
+            f"SOAP web service with {len(info.operations)} "
+            "operations including ExportMapImage, Find, Identify, "
+            "QueryFeatureData, and others."
+        ),
+        "distribution_format": DISTRIBUTION_FORMAT,
+        "distribution_media_type": DISTRIBUTION_MEDIA_TYPE,
+    }
+
+
+def _service_keywords(service_name: str) -> list[str]:
+    """Base keyword list supplemented from the service name."""
+    keywords = ["geospatial", "map service", "ArcGIS"]
+    name_parts = service_name.replace("_MapServer", "").split("_")
+    for part in name_parts:
+        kw = part.lower()
+        if kw and kw not in ("01", "02", "03") and len(kw) > 2:
+            keywords.append(kw)
+    return keywords
+
+
+def build_record(
+    info: ServiceInfo,
+    ai_results: AiResult | None = None,
+    themes: ThemeResult | None = None,
+) -> MetadataRecord:
+    """Resolve extracted WSDL info and AI suggestions into a MetadataRecord.
+
+    Gap field values already present in the source (info.source_values,
+    set by readers.metadata_xml) take precedence over AI suggestions. A
+    confident local theme classification takes precedence over an AI
+    theme, and its ranked keywords extend the service-name keywords.
+
+    Args:
+        info: ServiceInfo returned by readers.wsdl.parse_wsdl() or
+              readers.metadata_xml.iter_metadata_records()
+        ai_results: optional AI-suggested gap field values
+        themes: optional ThemeResult from metadata.themes.classify_corpus()
+    """
+    endpoint = info.endpoint_url if info.endpoint_url is not None else PLACEHOLDER
+    service_name = info.service_name
+
+    if info.keywords:
+        keywords = list(info.keywords)
+    elif info.source_standard:
+        keywords = ["geospatial"]
+    else:
+        keywords = _service_keywords(service_name)
+    if themes is not None:
+        keywords += [kw for kw in themes.keywords if kw not in keywords]
+        if themes.confident:
+            ai_results = replace(ai_results or AiResult(), theme=list(themes.themes))
+
+    if info.source_values is not None:
+        ai_results = (ai_results or AiResult()).merged(info.source_values)
+
+    ai_contact = ai_results.get("contactPoint", {}) if ai_results is not None else {}
+    if isinstance(ai_contact, dict):
+        contact_fn = ai_contact.get("fn", PLACEHOLDER)
+        contact_email = ai_contact.get("hasEmail", PLACEHOLDER)
+        if contact_fn == INSUFFICIENT:
+            contact_fn = PLACEHOLDER
+        if contact_email == INSUFFICIENT:
+            contact_email = PLACEHOLDER
+    else:
+        contact_fn = PLACEHOLDER
+        contact_email = PLACEHOLDER
+
+    return MetadataRecord(
+        title=info.title,
+        identifier=info.file_identifier or endpoint,
+        service_name=service_name,
+        description=_resolve_ai(ai_results, "description"),
+        keywords=keywords,
+        modified=_resolve_ai(ai_results, "modified"),
+        publisher_name=info.publisher_name if info.publisher_name is not None else PLACEHOLDER,
+        publisher_parent=info.publisher_sub_organization_of or None,
+        contact_fn=contact_fn,
+        contact_email=contact_email,
+        bureau_code=_resolve_ai(ai_results, "bureauCode", [PLACEHOLDER]),
+        program_code=_resolve_ai(ai_results, "programCode", [PLACEHOLDER]),
+        license=_resolve_ai(ai_results, "license"),
+        spatial=_resolve_ai(ai_results, "spatial"),
+        temporal=_resolve_ai(ai_results, "temporal"),
+        theme=_resolve_ai(ai_results, "theme", [PLACEHOLDER]),
+        access_url=endpoint,
+        **_distribution(info),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Value helpers shared by the XML writers
+# ---------------------------------------------------------------------------
+
+def as_list(value) -> list[str]:
+    """Normalise a scalar-or-list field value to a list of strings."""
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def parse_bbox(spatial: str) -> tuple[float, float, float, float] | None:
+    """Parse a DCAT-US "xmin,ymin,xmax,ymax" extent, or None if not a bbox."""
+    if not isinstance(spatial, str):
+        return None
+    parts = [p.strip() for p in spatial.split(",")]
+    if len(parts) != 4:
+        return None
+    try:
+        xmin, ymin, xmax, ymax = (float(p) for p in parts)
+    except ValueError:
+        return None
+    return xmin, ymin, xmax, ymax
+
+
+_DATE_PART_RE = re.compile(r"^(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?")
+_DURATION_PART_RE = re.compile(
+    r"^P(?:(\d+)Y)?(?:(\d+)M)?(?:(\d+)W)?(?:(\d+)D)?"
+    r"(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+(?:\.\d+)?)S)?)?$"
+)
+
+
+def _offset_date(value: str, duration: str, sign: int = 1) -> str | None:
+    """Add (sign=1) or subtract (sign=-1) an ISO 8601 duration to a date.
+
+    Returns a YYYY-MM-DD date, or None if either part is unparseable.
+    Missing month/day parts count as 01; time parts are added then truncated.
+    """
+    date_match = _DATE_PART_RE.match(value)
+    duration_match = _DURATION_PART_RE.match(duration)
+    if not date_match or not duration_match:
+        return None
+    year, month, day = (int(part or 1) for part in date_match.groups())
+    years, months, weeks, days, hours, minutes, seconds = (
+        float(part or 0) for part in duration_match.groups()
+    )
+    month_index = year * 12 + (month - 1) + sign * (int(years) * 12 + int(months))
+    year, month = divmod(month_index, 12)
+    month += 1
+    try:
+        # Clamp to the last day of the target month (e.g. Jan 31 + P1M → Feb 28/29)
+        last_day = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+        start = date(year, month, min(day, last_day))
+        result = start + sign * timedelta(
+            weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds
+        )
+    except (OverflowError, ValueError):
+        return None
+    return result.isoformat()
+
+
+def split_interval(temporal: str) -> tuple[str, str | None] | None:
+    """Split an ISO 8601 interval into (start, end).
+
+    "YYYY-MM-DD/YYYY-MM-DD" yields both ends, and a start or end given as a
+    duration ("2020-01-01/P5Y", "P1M/2024-01-01") is resolved to a date.
+    Repeating intervals such as "R/YYYY-MM-DD/P1Y" are ongoing and yield
+    (start, None). Returns None if unparseable.
+    """
+    if not isinstance(temporal, str) or "/" not in temporal:
+        return None
+    parts = temporal.split("/")
+    if parts[0].startswith("R"):
+        return (parts[1], None) if len(parts) >= 2 and parts[1] else None
+    if len(parts) != 2 or not all(parts):
+        return None
+    start, end = parts
+    if start.startswith("P"):
+        start = _offset_date(end, start, sign=-1)
+        return (start, end) if start else None
+    if end.startswith("P"):
+        end = _offset_date(start, end)
+    return start, end
+
+
+def strip_mailto(email: str) -> str:
+    """Drop a leading "mailto:" from a DCAT-US hasEmail value."""
+    return re.sub(r"^mailto:", "", email or "", flags=re.IGNORECASE)
@@ -0,0 +1,252 @@
+"""Local theme and keyword classifier — term-weight scoring against ISO 19115 topic categories.
+
+"theme" is a closed-vocabulary field, so an LLM call per service is
+unnecessary when the evidence is clear. Service names, layer names and
+REST descriptions are tokenized, a log-scaled term-frequency weight is
+computed for every (service, term) pair, and each service is scored
+against seed-term vectors for the 19 ISO topic categories with a handful
+of NumPy operations over a whole batch. Confidence combines how dominant
+the best category is with how much evidence supports it (distinct seed
+terms matched), so a single incidental hit such as "activity" is not
+enough. Services whose best category falls below the confidence
+threshold are left for the LLM.
+
+Weights depend only on the service's own document (there is no IDF), so
+a service gets the same result whether it is classified alone, in a
+batch, or in any --shard of a corpus.
+"""
+
+import re
+from collections.abc import Sequence
+
+import numpy as np
+
+from metagen.metadata.model import ISO_TOPIC_CATEGORIES
+from metagen.records import RestEnrichment, ServiceInfo, ThemeResult
+
+# Seed terms per ISO 19115 topic category (after tokenization)
+TOPIC_SEEDS: dict[str, tuple[str, ...]] = {
+    "farming": (
+        "farm", "farming", "agriculture", "agricultural", "crop", "crops", "livestock",
+        "grazing", "allotment", "allotments", "pasture", "range", "rangeland", "irrigation",
+    ),
+    "biota": (
+        "wildlife", "habitat", "species", "vegetation", "fish", "fisheries", "bird", "birds",
+        "ecology", "ecological", "biological", "flora", "fauna", "invasive", "plants",
+        "botany", "tree", "trees", "insect", "insects", "pollinator",
+    ),
+    "boundaries": (
+        "boundary", "boundaries", "administrative", "district", "districts", "region",
+        "regions", "county", "counties", "state", "states", "jurisdiction", "proclaimed",
+        "congressional", "ranger",
+    ),
+    "climatologyMeteorologyAtmosphere": (
+        "climate", "weather", "precipitation", "temperature", "atmosphere", "atmospheric",
+        "air", "wind", "snow", "snowpack", "meteorology", "meteorological", "drought",
+    ),
+    "economy": (
+        "economy", "economic", "economics", "timber", "sale", "sales", "harvest", "mining",
+        "mineral", "oil", "gas", "revenue", "employment", "permit", "permits", "lease", "leases",
+    ),
+    "elevation": (
+        "elevation", "dem", "terrain", "slope", "aspect", "contour", "contours",
+        "bathymetry", "altitude", "lidar", "hillshade", "topography", "topographic",
+    ),
+    "environment": (
+        "environment", "environmental", "fire", "fires", "wildfire", "burn", "burned",
+        "fuel", "fuels", "pollution", "conservation", "restoration", "hazard", "hazardous",
+        "treatment", "treatments", "disturbance", "reforestation", "activity", "activities",
+    ),
+    "geoscientificInformation": (
+        "geology", "geologic", "geological", "soil", "soils", "earthquake", "landslide",
+        "geophysics", "geophysical", "hydrogeology", "erosion", "cave", "caves", "groundwater",
+    ),
+    "health": ("health", "disease", "diseases", "hospital", "safety", "hygiene", "injury"),
+    "imageryBaseMapsEarthCover": (
+        "imagery", "image", "images", "aerial", "satellite", "orthophoto", "orthoimagery",
+        "basemap", "landcover", "cover", "canopy", "naip", "raster",
+    ),
+    "intelligenceMilitary": ("military", "defense", "army", "navy", "intelligence"),
+    "inlandWaters": (
+        "water", "waters", "river", "rivers", "stream", "streams", "lake", "lakes",
+        "watershed", "watersheds", "hydrology", "hydrologic", "hydrography", "wetland",
+        "wetlands", "flood", "drainage", "huc", "riparian", "aquatic",
+    ),
+    "location": (
+        "address", "addresses", "place", "places", "names", "gazetteer", "location",
+        "locations", "postal", "geographic",
+    ),
+    "oceans": ("ocean", "oceans", "marine", "coastal", "coast", "sea", "tide", "tides", "reef"),
+    "planningCadastre": (
+        "planning", "plan", "plans", "land", "use", "zoning", "cadastral", "cadastre",
+        "parcel", "parcels", "ownership", "status", "survey", "plss", "management",
+        "designation", "designations", "wilderness", "inventoried", "roadless",
+    ),
+    "society": (
+        "recreation", "recreational", "cultural", "heritage", "population", "demographic",
+        "demographics", "archaeology", "archaeological", "tribal", "tribe", "tribes",
+        "education", "campground", "campgrounds", "visitor", "visitors", "community",
+    ),
+    "structure": (
+        "building", "buildings", "facility", "facilities", "structure", "structures",
+        "dam", "dams", "bridge", "bridges", "infrastructure", "tower", "towers",
+    ),
+    "transportation": (
+        "road", "roads", "trail", "trails", "transportation", "highway", "highways",
+        "route", "routes", "airport", "airports", "railroad", "railroads", "travel", "motor",
+    ),
+    "utilitiesCommunication": (
+        "utility", "utilities", "power", "electric", "electrical", "pipeline", "pipelines",
+        "communication", "communications", "telecommunication", "energy", "transmission",
+    ),
+}
+
+_CATEGORIES = tuple(ISO_TOPIC_CATEGORIES)
+
+
+def _build_seed_matrix() -> tuple[dict[str, int], np.ndarray]:
+    """Return seed term → row and the (seed terms × categories) matrix, columns L2-normalised."""
+    rows: dict[str, int] = {}
+    for category in _CATEGORIES:
+        for tok in TOPIC_SEEDS[category]:
+            rows.setdefault(tok, len(rows))
+    matrix = np.zeros((len(rows), len(_CATEGORIES)))
+    for c, category in enumerate(_CATEGORIES):
+        matrix[[rows[tok] for tok in TOPIC_SEEDS[category]], c] = 1.0
+    return rows, matrix / np.sqrt(matrix.sum(axis=0))
+
+
+_SEED_ROWS, _SEED_MATRIX = _build_seed_matrix()
+
+# Words that carry no topical signal in ArcGIS service metadata
+_STOPWORDS = frozenset("""
+a an and are as at be by for from in is it of on or that the this to with
+arcgis edw esri fs usfs usda map maps mapserver service services layer layers
+data dataset datasets feature features group common attributes attribute
+national forest forests system information gis web soap rest server publish nfs
+""".split())
+
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split camelCase / snake_case text into lowercase content words."""
+    words = _CAMEL_RE.sub(" ", text or "")
+    return [
+        tok for tok in _TOKEN_RE.findall(words.lower())
+        if len(tok) > 2 and tok not in _STOPWORDS
+    ]
+
+
+def service_document(info: ServiceInfo, rest_info: RestEnrichment | None = None) -> list[str]:
+    """Gather the tokens that describe a service: name, title, layers and REST text."""
+    parts = [info.service_name, info.title, *info.keywords]
+    if rest_info is not None:
+        parts += [
+            rest_info.service_description or "",
+            rest_info.description or "",
+            rest_info.document_title or "",
+            rest_info.document_subject or "",
+            *rest_info.document_keywords,
+        ]
+        if rest_info.layers is not None:
+            parts += rest_info.layers.names
+    return tokenize(" ".join(parts))
+
+
+def classify_corpus(
+    services: Sequence[tuple[ServiceInfo, RestEnrichment | None]],
+    threshold: float = 0.6,
+    min_terms: int = 2,
+    max_themes: int = 3,
+    max_keywords: int = 10,
+) -> list[ThemeResult]:
+    """Assign ISO 19115 topic categories and ranked keywords to a batch of services.
+
+    Each service is scored independently; batching only amortises the
+    NumPy work.
+
+    Args:
+        services: (info, rest_info) pairs to classify
+        threshold: minimum confidence to mark a result confident. Confidence
+                   is the top category's share of the service's total
+                   category score, scaled down when fewer than min_terms
+                   distinct seed terms of that category were matched
+        min_terms: distinct seed terms needed for full confidence; with the
+                   defaults one matched term (confidence <= 0.5) never
+                   clears the threshold
+        max_themes: categories to return per service; secondary categories
+                    must score at least half the top one
+        max_keywords: ranked keywords to return per service, by weight and
+                      then first occurrence
+
+    Returns:
+        One ThemeResult per input service, in order.
+    """
+    docs = [service_document(info, rest) for info, rest in services]
+    n_docs = len(docs)
+    if n_docs == 0:
+        return []
+
+    vocab: dict[str, int] = {}
+    for tokens in docs:
+        for tok in tokens:
+            vocab.setdefault(tok, len(vocab))
+    if not vocab:
+        return [ThemeResult() for _ in docs]
+    terms = np.array(list(vocab), dtype=object)
+    seed_row = np.array([_SEED_ROWS.get(tok, -1) for tok in vocab], dtype=np.int64)
+
+    # Sparse (doc, term) term counts in COO form, with each pair's first token position
+    doc_idx = np.fromiter(
+        (d for d, tokens in enumerate(docs) for _ in tokens), dtype=np.int64
+    )
+    term_idx = np.fromiter(
+        (vocab[tok] for tokens in docs for tok in tokens), dtype=np.int64
+    )
+    pair = doc_idx * len(vocab) + term_idx
+    pair, first, tf = np.unique(pair, return_index=True, return_counts=True)
+    doc_idx, term_idx = np.divmod(pair, len(vocab))
+
+    # Log-scaled term frequency, L2-normalised per document
+    weight = 1.0 + np.log(tf)
+    norms = np.sqrt(np.bincount(doc_idx, weights=weight ** 2, minlength=n_docs))
+    weight = weight / norms[doc_idx]
+
+    # Category scores from the seed-term pairs only
+    is_seed = seed_row[term_idx] >= 0
+    seed_docs = doc_idx[is_seed]
+    seed_hits = _SEED_MATRIX[seed_row[term_idx[is_seed]]]
+    scores = np.zeros((n_docs, len(_CATEGORIES)))
+    np.add.at(scores, seed_docs, weight[is_seed, None] * seed_hits)
+    # Distinct seed terms matched per category ((doc, term) pairs are unique)
+    matched = np.zeros((n_docs, len(_CATEGORIES)))
+    np.add.at(matched, seed_docs, seed_hits > 0)
+
+    totals = scores.sum(axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :max_themes]
+    top = scores[np.arange(n_docs), order[:, 0]]
+    share = np.divide(top, totals, out=np.zeros(n_docs), where=totals > 0)
+    evidence = np.minimum(matched[np.arange(n_docs), order[:, 0]] / max(min_terms, 1), 1.0)
+    confidence = share * evidence
+
+    # Ranked keywords: highest-weighted terms per document, earliest first on ties
+    rank = np.lexsort((first, -weight, doc_idx))
+    starts = np.searchsorted(doc_idx[rank], np.arange(n_docs))
+    ends = np.searchsorted(doc_idx[rank], np.arange(n_docs), side="right")
+
+    results = []
+    for d in range(n_docs):
+        themes = [
+            _CATEGORIES[c] for c in order[d]
+            if scores[d, c] > 0 and scores[d, c] >= 0.5 * top[d]
+        ]
+        keywords = terms[term_idx[rank[starts[d]:min(ends[d], starts[d] + max_keywords)]]]
+        results.append(ThemeResult(
+            themes=tuple(themes),
+            confidence=round(float(confidence[d]), 3),
+            keywords=tuple(keywords),
+            confident=bool(themes) and bool(confidence[d] >= threshold),
+        ))
+    return results
@@ -0,0 +1,56 @@
+"""Output writer registry — maps format names to serializers over MetadataRecord."""
+
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable
+
+from metagen.metadata.dcat_us import write_dcat_us
+from metagen.metadata.fgdc import write_fgdc
+from metagen.metadata.iso19115 import write_iso19115
+from metagen.metadata.model import MetadataRecord
+
+
+@dataclass(frozen=True)
+class Writer:
+    """A named output format and the function that renders it."""
+    name: str
+    suffix: str
+    write: Callable[[MetadataRecord, IO[bytes]], None]
+
+
+WRITERS: dict[str, Writer] = {
+    w.name: w
+    for w in (
+        Writer("dcat-us", "_dcat_us.json", write_dcat_us),
+        Writer("iso19115", "_iso19115.xml", write_iso19115),
+        Writer("fgdc", "_fgdc.xml", write_fgdc),
+    )
+}
+
+
+def write_formats(record: MetadataRecord, paths: dict[str, Path]) -> None:
+    """Render *record* once per requested format.
+
+    Args:
+        record: resolved metadata record
+        paths: mapping of format name (a WRITERS key) to output file path;
+               missing parent directories are created
+    """
+    for name, path in paths.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as fh:
+            WRITERS[name].write(record, fh)
+
+
+def write_formats_to_zip(record: MetadataRecord, zf: zipfile.ZipFile, names: dict[str, str]) -> None:
+    """Render *record* once per requested format as members of an open zip.
+
+    Args:
+        record: resolved metadata record
+        zf: zip archive opened for writing
+        names: mapping of format name (a WRITERS key) to member name
+    """
+    for name, member in names.items():
+        with zf.open(member, "w") as fh:
+            WRITERS[name].write(record, fh)
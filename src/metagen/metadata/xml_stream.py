@@ -0,0 +1,58 @@
+"""Streaming XML output — writes indented elements straight to a file handle.
+
+Writers emit elements as they go instead of building an ElementTree, so
+memory stays flat regardless of how many records are rendered.
+"""
+
+from contextlib import contextmanager
+from typing import IO
+from xml.sax.saxutils import XMLGenerator
+
+
+class XmlStream:
+    """Thin indenting wrapper around xml.sax.saxutils.XMLGenerator."""
+
+    def __init__(self, fh: IO[bytes], indent: str = "  "):
+        self._gen = XMLGenerator(fh, encoding="utf-8", short_empty_elements=True)
+        self._indent = indent
+        self._depth = 0
+        # One flag per open element: has it had a child element written yet?
+        self._has_children: list[bool] = []
+
+    def start_document(self) -> None:
+        self._gen.startDocument()
+
+    def end_document(self) -> None:
+        self._gen.ignorableWhitespace("\n")
+        self._gen.endDocument()
+
+    def _newline(self) -> None:
+        self._gen.ignorableWhitespace("\n" + self._indent * self._depth)
+
+    def start(self, name: str, attrs: dict[str, str] | None = None) -> None:
+        if self._has_children:
+            self._has_children[-1] = True
+            self._newline()
+        self._gen.startElement(name, attrs or {})
+        self._depth += 1
+        self._has_children.append(False)
+
+    def end(self, name: str) -> None:
+        self._depth -= 1
+        if self._has_children.pop():
+            self._newline()
+        self._gen.endElement(name)
+
+    @contextmanager
+    def element(self, name: str, attrs: dict[str, str] | None = None):
+        """Context manager wrapping start()/end() for a container element."""
+        self.start(name, attrs)
+        yield
+        self.end(name)
+
+    def leaf(self, name: str, text: str | None, attrs: dict[str, str] | None = None) -> None:
+        """Write a text-only element on a single line."""
+        self.start(name, attrs)
+        if text:
+            self._gen.characters(str(text))
+        self.end(name)
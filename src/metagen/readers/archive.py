@@ -0,0 +1,118 @@
+"""Archive reader — streams WSDL files out of zip/tar archives without extracting.
+
+WSDL corpora are often delivered as archives of tens of thousands of small
+XML files. Members are read straight into memory one at a time (tar
+archives are read as a forward-only stream) and handed to parse_wsdl(),
+optionally across a pool of worker processes.
+"""
+
+import io
+import sys
+import tarfile
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from metagen.readers.wsdl import parse_wsdl
+from metagen.records import ServiceInfo
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+WSDL_SUFFIXES = (".xml", ".wsdl")
+
+
+def is_archive(path: str | Path) -> bool:
+    """True if *path* names a zip or tar archive (judged by its suffix)."""
+    return Path(path).name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def archive_stem(path: str | Path) -> str:
+    """File name without its archive suffix, e.g. "wsdls.tar.gz" → "wsdls"."""
+    name = Path(path).name
+    for suffix in sorted(ARCHIVE_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return Path(path).stem
+
+
+def iter_archive_members(
+    path: str | Path,
+    suffixes: tuple[str, ...] = WSDL_SUFFIXES,
+) -> Iterator[tuple[str, bytes]]:
+    """Yield (member_name, content) for each file in the archive matching *suffixes*."""
+    path = Path(path)
+    if path.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(suffixes):
+                    yield info.filename, zf.read(info)
+        return
+
+    # "r|*" reads the tar as a forward-only stream with transparent decompression
+    with tarfile.open(path, mode="r|*") as tf:
+        for member in tf:
+            if not member.isfile() or not member.name.lower().endswith(suffixes):
+                continue
+            fh = tf.extractfile(member)
+            if fh is not None:
+                yield member.name, fh.read()
+
+
+def iter_directory_members(
+    path: str | Path,
+    suffixes: tuple[str, ...] = WSDL_SUFFIXES,
+) -> Iterator[tuple[str, bytes]]:
+    """Yield (relative_name, content) for matching files below a directory, in sorted order."""
+    root = Path(path)
+    for file_path in sorted(root.rglob("*")):
+        if file_path.is_file() and file_path.name.lower().endswith(suffixes):
+            yield file_path.relative_to(root).as_posix(), file_path.read_bytes()
+
+
+def _parse_member(member: tuple[str, bytes]) -> tuple[str, ServiceInfo | None, str | None]:
+    name, content = member
+    try:
+        return name, parse_wsdl(io.BytesIO(content)), None
+    except ET.ParseError as e:
+        return name, None, str(e)
+
+
+def parse_wsdl_members(
+    members: Iterable[tuple[str, bytes]],
+    workers: int = 1,
+) -> Iterator[tuple[str, ServiceInfo]]:
+    """Parse (name, content) members with parse_wsdl(), yielding (name, info) in input order.
+
+    With workers > 1, parsing runs in a process pool. At most a few members
+    per worker are in flight at once, so memory stays bounded however large
+    the archive. Members that are not well-formed XML are reported on
+    stderr and skipped.
+    """
+    if workers <= 1:
+        results = map(_parse_member, members)
+        yield from _report_errors(results)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = workers * 4
+        in_flight: deque = deque()
+
+        def results():
+            for member in members:
+                in_flight.append(executor.submit(_parse_member, member))
+                if len(in_flight) >= window:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+        yield from _report_errors(results())
+
+
+def _report_errors(results) -> Iterator[tuple[str, ServiceInfo]]:
+    for name, info, error in results:
+        if info is None:
+            print(f"Warning: skipping {name}: {error}", file=sys.stderr)
+            continue
+        yield name, info
@@ -0,0 +1,326 @@
+"""Metadata XML reader — streams records out of existing FGDC CSDGM and ISO 19139 files.
+
+Agency metadata dumps are often single files holding many records (an
+FGDC <metadata> per dataset, or gmd:MD_Metadata elements inside a CSW
+response). Records are read with ElementTree.iterparse and detached from
+the tree as soon as they have been extracted, so memory stays bounded by
+one record regardless of file size.
+
+Each record is returned as a ServiceInfo, like readers.wsdl.parse_wsdl()
+output, with the DCAT-US gap fields the source already supplies collected
+in source_values so they flow through build_dcat_us() and the gap report.
+Source values that fail the DCAT-US format checks (e.g. an FGDC pubdate
+of "Unknown") are dropped and recorded in source_problems instead.
+"""
+
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator
+from pathlib import Path
+
+from metagen.metadata.dcat_us import validate_gap_fields
+from metagen.metadata.model import INSUFFICIENT
+from metagen.records import AiResult, ServiceInfo
+
+FGDC = "FGDC CSDGM"
+ISO19139 = "ISO 19139"
+
+_GMD_NS = "http://www.isotc211.org/2005/gmd"
+_ISO_RECORD_TAG = f"{{{_GMD_NS}}}MD_Metadata"
+_FGDC_RECORD_TAG = "metadata"
+
+
+def _record_standard(tag: str) -> str | None:
+    if tag == _FGDC_RECORD_TAG:
+        return FGDC
+    if tag == _ISO_RECORD_TAG:
+        return ISO19139
+    return None
+
+
+def detect_standard(path: str | Path) -> str | None:
+    """Return FGDC or ISO19139 for the first record found in *path*, else None.
+
+    Only reads as far as the first record's start tag.
+    """
+    for _event, elem in ET.iterparse(path, events=("start",)):
+        standard = _record_standard(elem.tag)
+        if standard:
+            return standard
+    return None
+
+
+def iter_metadata_records(path: str | Path) -> Iterator[ServiceInfo]:
+    """Yield one ServiceInfo per FGDC or ISO 19139 record in *path*.
+
+    Works for single-record files and for multi-record dumps where the
+    records are wrapped in an arbitrary container element.
+    """
+    stack: list[ET.Element] = []
+    record_depth: int | None = None
+
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if record_depth is None and _record_standard(elem.tag):
+                record_depth = len(stack)
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        if record_depth is None or len(stack) != record_depth:
+            continue
+
+        record_depth = None
+        if elem.tag == _FGDC_RECORD_TAG:
+            yield _extract_fgdc(elem)
+        else:
+            yield _extract_iso(elem)
+
+        # Detach the finished record so the partial tree never grows
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+# ---------------------------------------------------------------------------
+# Shared helpers
+# ---------------------------------------------------------------------------
+
+def _text(elem: ET.Element, path: str) -> str | None:
+    found = elem.find(path)
+    if found is None or found.text is None:
+        return None
+    return found.text.strip() or None
+
+
+def _texts(elem: ET.Element, path: str) -> list[str]:
+    return [el.text.strip() for el in elem.iterfind(path) if el.text and el.text.strip()]
+
+
+def _iso_date(value: str | None) -> str | None:
+    """Normalise an FGDC YYYYMMDD (or YYYY, YYYYMM) date to ISO 8601."""
+    if not value:
+        return None
+    match = re.match(r"^(\d{4})(\d{2})?(\d{2})?$", value)
+    if not match:
+        return value
+    return "-".join(part for part in match.groups() if part)
+
+
+def _bbox(west, south, east, north) -> str | None:
+    try:
+        values = [float(v) for v in (west, south, east, north)]
+    except (TypeError, ValueError):
+        return None
+    return ",".join(str(v) for v in values)
+
+
+def _interval(begin: str | None, end: str | None) -> str | None:
+    """Build a begin/end interval; open-ended ranges ("Present", "Unknown") stay a gap.
+
+    The source says nothing about how such a range repeats or ends, so no
+    repeat or end date is invented for it.
+    """
+    if not begin or not end or end.lower() in ("present", "unknown", "now"):
+        return None
+    return f"{begin}/{end}"
+
+
+def _base_info(
+    standard: str,
+    version: str | None,
+    title: str | None,
+    endpoint: str | None,
+    publisher: str | None,
+) -> ServiceInfo:
+    """Build the parse_wsdl()-compatible part of a record's ServiceInfo."""
+    info = ServiceInfo(
+        source_standard=standard,
+        source_version=version or "",
+        service_name=title or "",
+        title=title or "",
+        target_namespace=_GMD_NS if standard == ISO19139 else "",
+        publisher_name=publisher or None,
+    )
+    if endpoint:
+        info.endpoint_url = endpoint
+        domain_match = re.search(r"https?://([^/]+)", endpoint)
+        if domain_match:
+            info.domain = domain_match.group(1)
+    return info
+
+
+def _contact_point(fn: str | None, email: str | None) -> dict | None:
+    """Build a DCAT-US contactPoint dict from whichever parts are present."""
+    contact = {}
+    if fn:
+        contact["fn"] = fn
+    if email:
+        contact["hasEmail"] = f"mailto:{email}"
+    return contact or None
+
+
+def _set_source_values(info: ServiceInfo, **values) -> None:
+    """Store the valid DCAT-US gap field values present in the source on *info*.
+
+    Values that fail validate_gap_fields() are left out of source_values,
+    so they are reported as gaps, and their problems kept in source_problems.
+    """
+    present = {k: v for k, v in values.items() if v}
+    checked = dict(present)
+    contact = checked.get("contactPoint")
+    if contact and "hasEmail" not in contact:
+        # A contact name without an email is still worth keeping
+        checked["contactPoint"] = {**contact, "hasEmail": INSUFFICIENT}
+    problems = validate_gap_fields(checked, fields=list(present))
+    for name, problem in problems.items():
+        print(
+            f"Warning: ignoring invalid source {name} {present[name]!r} "
+            f"in {info.title or 'untitled record'}: {problem}",
+            file=sys.stderr,
+        )
+        del present[name]
+    info.source_values = AiResult.from_dict(present)
+    info.source_problems = problems or None
+
+
+# ---------------------------------------------------------------------------
+# FGDC CSDGM
+# ---------------------------------------------------------------------------
+
+def _extract_fgdc(record: ET.Element) -> ServiceInfo:
+    cite = "idinfo/citation/citeinfo/"
+    title = _text(record, cite + "title")
+    endpoint = _text(record, cite + "onlink") or _text(
+        record, "distinfo/stdorder/digform/digtopt/onlinopt/computer/networka/networkr"
+    )
+    publisher = _text(record, cite + "origin")
+
+    info = _base_info(FGDC, _text(record, "metainfo/metstdv"), title, endpoint, publisher)
+
+    keywords: list[str] = []
+    themes: list[str] = []
+    for theme in record.iterfind("idinfo/keywords/theme"):
+        thesaurus = (_text(theme, "themekt") or "").lower()
+        keys = _texts(theme, "themekey")
+        if "19115" in thesaurus:
+            themes.extend(keys)
+        else:
+            keywords.extend(keys)
+    info.keywords = tuple(keywords)
+
+    bounding = "idinfo/spdom/bounding/"
+    timeinfo = "idinfo/timeperd/timeinfo/"
+    single = _text(record, timeinfo + "sngdate/caldate")
+    begin = _text(record, timeinfo + "rngdates/begdate") or single
+    end = _text(record, timeinfo + "rngdates/enddate") or single
+
+    contact = record.find("idinfo/ptcontac/cntinfo")
+    contact_point = None
+    if contact is not None:
+        fn = (
+            _text(contact, "cntperp/cntper")
+            or _text(contact, "cntorgp/cntper")
+            or _text(contact, "cntorgp/cntorg")
+            or _text(contact, "cntperp/cntorg")
+        )
+        contact_point = _contact_point(fn, _text(contact, "cntemail"))
+
+    license_text = _text(record, "idinfo/useconst")
+
+    _set_source_values(
+        info,
+        description=_text(record, "idinfo/descript/abstract"),
+        modified=_iso_date(_text(record, cite + "pubdate") or _text(record, "metainfo/metd")),
+        contactPoint=contact_point,
+        license=license_text if license_text and license_text.startswith("http") else None,
+        spatial=_bbox(
+            _text(record, bounding + "westbc"),
+            _text(record, bounding + "southbc"),
+            _text(record, bounding + "eastbc"),
+            _text(record, bounding + "northbc"),
+        ),
+        temporal=_interval(_iso_date(begin), _iso_date(end)),
+        theme=themes,
+    )
+    return info
+
+
+# ---------------------------------------------------------------------------
+# ISO 19139
+# ---------------------------------------------------------------------------
+
+# "{*}" matches any namespace, which tolerates the gml / gml 3.2 split. Text
+# properties hold either a gco:CharacterString or a gmx:Anchor, so they are
+# read from whichever child element is present.
+_CHAR = "*"
+_XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def _iso_party(party: ET.Element | None) -> dict | None:
+    if party is None:
+        return None
+    fn = _text(party, f"{{*}}individualName/{_CHAR}") or _text(party, f"{{*}}organisationName/{_CHAR}")
+    email = _text(
+        party,
+        f"{{*}}contactInfo/{{*}}CI_Contact/{{*}}address/{{*}}CI_Address/{{*}}electronicMailAddress/{_CHAR}",
+    )
+    return _contact_point(fn, email)
+
+
+def _extract_iso(record: ET.Element) -> ServiceInfo:
+    ident = record.find("{*}identificationInfo/*")
+    if ident is None:
+        ident = ET.Element("empty")
+
+    title = _text(ident, f"{{*}}citation/{{*}}CI_Citation/{{*}}title/{_CHAR}")
+    endpoint = _text(record, ".//{*}distributionInfo//{*}CI_OnlineResource/{*}linkage/{*}URL")
+    publisher = _text(record, f"{{*}}contact/{{*}}CI_ResponsibleParty/{{*}}organisationName/{_CHAR}")
+
+    info = _base_info(
+        ISO19139, _text(record, f"{{*}}metadataStandardVersion/{_CHAR}"), title, endpoint, publisher
+    )
+    file_id = _text(record, f"{{*}}fileIdentifier/{_CHAR}")
+    info.file_identifier = file_id
+
+    keywords = _texts(ident, f"{{*}}descriptiveKeywords/{{*}}MD_Keywords/{{*}}keyword/*")
+    info.keywords = tuple(keywords)
+
+    bbox_el = ident.find(".//{*}EX_GeographicBoundingBox")
+    spatial = None
+    if bbox_el is not None:
+        spatial = _bbox(
+            _text(bbox_el, "{*}westBoundLongitude/{*}Decimal"),
+            _text(bbox_el, "{*}southBoundLatitude/{*}Decimal"),
+            _text(bbox_el, "{*}eastBoundLongitude/{*}Decimal"),
+            _text(bbox_el, "{*}northBoundLatitude/{*}Decimal"),
+        )
+
+    period = ident.find(".//{*}EX_TemporalExtent/{*}extent/*")
+    temporal = None
+    if period is not None:
+        temporal = _interval(_text(period, "{*}beginPosition"), _text(period, "{*}endPosition"))
+
+    # A license URL is either the text or, for a gmx:Anchor, its xlink:href
+    licenses = [
+        value
+        for el in ident.iterfind(f"{{*}}resourceConstraints/*/*/{_CHAR}")
+        for value in ((el.text or "").strip(), el.get(_XLINK_HREF, ""))
+        if value.startswith("http")
+    ]
+
+    _set_source_values(
+        info,
+        description=_text(ident, f"{{*}}abstract/{_CHAR}"),
+        modified=_text(record, "{*}dateStamp/{*}Date") or _text(record, "{*}dateStamp/{*}DateTime"),
+        contactPoint=(
+            _iso_party(ident.find("{*}pointOfContact/{*}CI_ResponsibleParty"))
+            or _iso_party(record.find("{*}contact/{*}CI_ResponsibleParty"))
+        ),
+        license=licenses[0] if licenses else None,
+        spatial=spatial,
+        temporal=temporal,
+        theme=_texts(ident, "{*}topicCategory/{*}MD_TopicCategoryCode"),
+    )
+    return info
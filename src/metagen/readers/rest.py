@@ -5,11 +5,20 @@ extracts metadata useful for gap-filling (spatial extent, service
 description, keywords, layer info, etc.).
 """
 
+import math
 import re
 import sys
 
 import requests
 
+from metagen.records import AiResult, LayerTable, RestEnrichment
+
+_GEOGRAPHIC_WKIDS = frozenset({4326, 4269})
+_WEB_MERCATOR_WKIDS = frozenset({102100, 102113, 3857})
+_EARTH_RADIUS = 6378137.0
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([.,;:!?])")
+
 
 def wsdl_endpoint_to_rest_url(wsdl_endpoint: str) -> str:
     """Convert a WSDL SOAP endpoint URL to its ArcGIS REST equivalent.
@@ -64,43 +73,78 @@ def fetch_rest_metadata(rest_url: str, timeout: int = 30) -> dict | None:
     return None
 
 
-def extract_enrichment(rest_data: dict) -> dict:
+def extract_enrichment(rest_data: dict) -> RestEnrichment:
     """Extract metadata relevant to gap-filling from raw ArcGIS REST JSON.
 
-    Returns a dict with normalized keys. Missing fields default to None
-    or empty lists.
+    Returns a RestEnrichment with normalized fields. Missing fields default
+    to None or empty sequences.
     """
     doc_info = rest_data.get("documentInfo") or {}
 
-    # Parse keywords string into a list
+    # Parse keywords string into a tuple
     raw_keywords = doc_info.get("Keywords", "")
     if isinstance(raw_keywords, str) and raw_keywords.strip():
-        keywords = [k.strip() for k in raw_keywords.split(",") if k.strip()]
+        keywords = tuple(k.strip() for k in raw_keywords.split(",") if k.strip())
     else:
-        keywords = []
-
-    # Extract layer summaries
-    layers = [
-        {
-            "id": layer.get("id"),
-            "name": layer.get("name", ""),
-            "type": layer.get("type", ""),
-            "description": layer.get("description", ""),
-        }
-        for layer in (rest_data.get("layers") or [])
-    ]
-
-    return {
-        "service_description": rest_data.get("serviceDescription") or None,
-        "description": rest_data.get("description") or None,
-        "document_title": doc_info.get("Title") or None,
-        "document_subject": doc_info.get("Subject") or None,
-        "document_author": doc_info.get("Author") or None,
-        "document_keywords": keywords,
-        "copyright_text": rest_data.get("copyrightText") or None,
-        "spatial_reference_wkid": (rest_data.get("spatialReference") or {}).get("wkid"),
-        "full_extent": rest_data.get("fullExtent"),
-        "initial_extent": rest_data.get("initialExtent"),
-        "layers": layers,
-        "capabilities": rest_data.get("capabilities") or None,
-    }
+        keywords = ()
+
+    return RestEnrichment(
+        service_description=rest_data.get("serviceDescription") or None,
+        description=rest_data.get("description") or None,
+        document_title=doc_info.get("Title") or None,
+        document_subject=doc_info.get("Subject") or None,
+        document_author=doc_info.get("Author") or None,
+        document_keywords=keywords,
+        copyright_text=rest_data.get("copyrightText") or None,
+        spatial_reference_wkid=(rest_data.get("spatialReference") or {}).get("wkid"),
+        full_extent=rest_data.get("fullExtent"),
+        initial_extent=rest_data.get("initialExtent"),
+        layers=LayerTable(rest_data.get("layers")),
+        capabilities=rest_data.get("capabilities") or None,
+    )
+
+
+def _extent_bbox(extent: dict | None, wkid: int | None) -> str | None:
+    """Return a WGS 84 "xmin,ymin,xmax,ymax" string for a REST extent, or None.
+
+    Only geographic and Web Mercator extents are converted; other
+    projections would need a projection library and are left as gaps.
+    """
+    if not extent:
+        return None
+    wkid = (extent.get("spatialReference") or {}).get("wkid", wkid)
+    try:
+        xmin, ymin, xmax, ymax = (float(extent[k]) for k in ("xmin", "ymin", "xmax", "ymax"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not all(map(math.isfinite, (xmin, ymin, xmax, ymax))):
+        return None
+    if wkid in _WEB_MERCATOR_WKIDS:
+        def lon(x: float) -> float:
+            return math.degrees(x / _EARTH_RADIUS)
+
+        def lat(y: float) -> float:
+            return math.degrees(2 * math.atan(math.exp(y / _EARTH_RADIUS)) - math.pi / 2)
+
+        xmin, ymin, xmax, ymax = lon(xmin), lat(ymin), lon(xmax), lat(ymax)
+    elif wkid not in _GEOGRAPHIC_WKIDS:
+        return None
+    return ",".join(f"{v:.4f}" for v in (xmin, ymin, xmax, ymax))
+
+
+def rest_gap_values(rest_info: RestEnrichment | None) -> AiResult | None:
+    """Gap field values that can be read straight from REST metadata, without an LLM.
+
+    description comes from the service description (HTML tags removed) and
+    spatial from the full extent; every other field is left unset. Returns
+    None if neither is available.
+    """
+    if rest_info is None:
+        return None
+    text = rest_info.service_description or rest_info.description or ""
+    description = " ".join(_TAG_RE.sub(" ", text).split())
+    description = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", description) or None
+    spatial = _extent_bbox(rest_info.full_extent, rest_info.spatial_reference_wkid)
+    if description is None and spatial is None:
+        return None
+    return AiResult(description=description, spatial=spatial)
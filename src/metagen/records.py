@@ -0,0 +1,264 @@
+"""Typed pipeline records — compact, slotted replacements for free-form dicts.
+
+parse_wsdl(), extract_enrichment(), ai_gap_fill() and build_record() pass
+these between stages. Every class uses __slots__ (no per-instance __dict__)
+and REST layers are stored column-wise in arrays rather than one dict per
+layer, which keeps per-service overhead low when a batch holds tens of
+thousands of services in memory. to_dict()/from_dict() convert to and from
+the dict shapes used in JSON output and LLM prompts.
+"""
+
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+# DCAT-US gap field name → AiResult attribute name
+GAP_FIELDS = {
+    "description": "description",
+    "modified": "modified",
+    "contactPoint": "contact_point",
+    "bureauCode": "bureau_code",
+    "programCode": "program_code",
+    "license": "license",
+    "spatial": "spatial",
+    "temporal": "temporal",
+    "theme": "theme",
+}
+
+_NO_ID = -1  # layer id sentinel for layers without an integer id
+
+
+@dataclass(slots=True)
+class ServiceInfo:
+    """Descriptive metadata for one service or source metadata record.
+
+    Produced by readers.wsdl.parse_wsdl() and
+    readers.metadata_xml.iter_metadata_records().
+    """
+
+    service_name: str = ""
+    title: str = ""
+    endpoint_url: str | None = None
+    target_namespace: str = ""
+    operations: tuple[str, ...] = ()
+    domain: str | None = None
+    publisher_name: str | None = None
+    publisher_sub_organization_of: str | None = None
+    # Set only for records read from existing FGDC / ISO metadata
+    source_standard: str | None = None
+    source_version: str | None = None
+    file_identifier: str | None = None
+    keywords: tuple[str, ...] = ()
+    source_values: "AiResult | None" = None
+    # Gap field name → problem, for source values that failed validation and were dropped
+    source_problems: dict[str, str] | None = None
+
+    def to_dict(self) -> dict:
+        """Return the parse_wsdl() dict shape, omitting unset optional keys."""
+        d: dict = {"service_name": self.service_name}
+        if self.endpoint_url is not None:
+            d["endpoint_url"] = self.endpoint_url
+        d["target_namespace"] = self.target_namespace
+        d["operations"] = list(self.operations)
+        if self.domain is not None:
+            d["domain"] = self.domain
+        if self.publisher_name is not None:
+            d["publisher_name"] = self.publisher_name
+        if self.publisher_sub_organization_of is not None:
+            d["publisher_subOrganizationOf"] = self.publisher_sub_organization_of
+        d["title"] = self.title
+        if self.source_standard is not None:
+            d["source_standard"] = self.source_standard
+            d["source_version"] = self.source_version or ""
+        if self.file_identifier is not None:
+            d["file_identifier"] = self.file_identifier
+        if self.keywords:
+            d["keywords"] = list(self.keywords)
+        if self.source_values is not None:
+            d["source_values"] = self.source_values.to_dict()
+        if self.source_problems:
+            d["source_problems"] = dict(self.source_problems)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ServiceInfo":
+        source_values = d.get("source_values")
+        return cls(
+            service_name=d.get("service_name", ""),
+            title=d.get("title", ""),
+            endpoint_url=d.get("endpoint_url"),
+            target_namespace=d.get("target_namespace", ""),
+            operations=tuple(d.get("operations", ())),
+            domain=d.get("domain"),
+            publisher_name=d.get("publisher_name"),
+            publisher_sub_organization_of=d.get("publisher_subOrganizationOf"),
+            source_standard=d.get("source_standard"),
+            source_version=d.get("source_version"),
+            file_identifier=d.get("file_identifier"),
+            keywords=tuple(d.get("keywords", ())),
+            source_values=AiResult.from_dict(source_values) if source_values else None,
+            source_problems=d.get("source_problems"),
+        )
+
+
+class LayerTable:
+    """Column-oriented store for REST layer summaries.
+
+    Ids live in a typed array and the string columns in tuples, so a
+    service's layers cost four containers rather than one dict per layer.
+    """
+
+    __slots__ = ("ids", "names", "types", "descriptions")
+
+    def __init__(self, layers: list[dict] | None = None):
+        layers = layers or []
+        self.ids = array("q", (
+            layer["id"] if isinstance(layer.get("id"), int) else _NO_ID for layer in layers
+        ))
+        self.names = tuple(layer.get("name", "") for layer in layers)
+        self.types = tuple(layer.get("type", "") for layer in layers)
+        self.descriptions = tuple(layer.get("description", "") for layer in layers)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self) -> Iterator[dict]:
+        for layer_id, name, type_, description in zip(
+            self.ids, self.names, self.types, self.descriptions
+        ):
+            yield {
+                "id": None if layer_id == _NO_ID else layer_id,
+                "name": name,
+                "type": type_,
+                "description": description,
+            }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, LayerTable):
+            return NotImplemented
+        return self.to_list() == other.to_list()
+
+    def __repr__(self) -> str:
+        return f"LayerTable({len(self)} layers)"
+
+    def to_list(self) -> list[dict]:
+        return list(self)
+
+
+@dataclass(slots=True)
+class RestEnrichment:
+    """Normalized ArcGIS REST metadata, as returned by readers.rest.extract_enrichment()."""
+
+    service_description: str | None = None
+    description: str | None = None
+    document_title: str | None = None
+    document_subject: str | None = None
+    document_author: str | None = None
+    document_keywords: tuple[str, ...] = ()
+    copyright_text: str | None = None
+    spatial_reference_wkid: int | None = None
+    full_extent: dict | None = None
+    initial_extent: dict | None = None
+    layers: LayerTable | None = None
+    capabilities: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "service_description": self.service_description,
+            "description": self.description,
+            "document_title": self.document_title,
+            "document_subject": self.document_subject,
+            "document_author": self.document_author,
+            "document_keywords": list(self.document_keywords),
+            "copyright_text": self.copyright_text,
+            "spatial_reference_wkid": self.spatial_reference_wkid,
+            "full_extent": self.full_extent,
+            "initial_extent": self.initial_extent,
+            "layers": self.layers.to_list() if self.layers is not None else [],
+            "capabilities": self.capabilities,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RestEnrichment":
+        return cls(
+            service_description=d.get("service_description"),
+            description=d.get("description"),
+            document_title=d.get("document_title"),
+            document_subject=d.get("document_subject"),
+            document_author=d.get("document_author"),
+            document_keywords=tuple(d.get("document_keywords", ())),
+            copyright_text=d.get("copyright_text"),
+            spatial_reference_wkid=d.get("spatial_reference_wkid"),
+            full_extent=d.get("full_extent"),
+            initial_extent=d.get("initial_extent"),
+            layers=LayerTable(d.get("layers")),
+            capabilities=d.get("capabilities"),
+        )
+
+
+@dataclass(slots=True)
+class AiResult:
+    """Values for the nine DCAT-US gap fields.
+
+    Used both for AI suggestions and for values already present in source
+    metadata. Unset fields are None; fields may also hold the
+    "INSUFFICIENT_EVIDENCE" marker returned by the LLM.
+    """
+
+    description: str | None = None
+    modified: str | None = None
+    contact_point: dict | None = None
+    bureau_code: list[str] | str | None = None
+    program_code: list[str] | str | None = None
+    license: str | None = None
+    spatial: str | None = None
+    temporal: str | None = None
+    theme: list[str] | str | None = None
+
+    def get(self, field_name: str, default=None):
+        """Look up a value by its DCAT-US field name (e.g. "bureauCode")."""
+        val = getattr(self, GAP_FIELDS[field_name])
+        return default if val is None else val
+
+    def filled_count(self) -> int:
+        """Number of gap fields holding a value (including INSUFFICIENT_EVIDENCE)."""
+        return sum(1 for attr in GAP_FIELDS.values() if getattr(self, attr) is not None)
+
+    def merged(self, override: "AiResult | None") -> "AiResult":
+        """Return a copy where every non-None field of *override* wins."""
+        if override is None:
+            return AiResult(**{attr: getattr(self, attr) for attr in GAP_FIELDS.values()})
+        return AiResult(**{
+            attr: getattr(override, attr) if getattr(override, attr) is not None else getattr(self, attr)
+            for attr in GAP_FIELDS.values()
+        })
+
+    def to_dict(self) -> dict:
+        """Return the DCAT-US-keyed dict, omitting unset fields."""
+        return {
+            name: getattr(self, attr)
+            for name, attr in GAP_FIELDS.items()
+            if getattr(self, attr) is not None
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict | None) -> "AiResult":
+        d = d or {}
+        return cls(**{attr: d.get(name) for name, attr in GAP_FIELDS.items()})
+
+
+@dataclass(slots=True)
+class ThemeResult:
+    """Local theme classification for one service, from metadata.themes.classify_corpus().
+
+    confidence weighs the top topic category's share of the score by the
+    number of its seed terms matched. confident is True when it clears the
+    classifier threshold; only then does the local theme replace an LLM
+    suggestion.
+    Ranked keywords are used regardless.
+    """
+
+    themes: tuple[str, ...] = ()
+    confidence: float = 0.0
+    keywords: tuple[str, ...] = ()
+    confident: bool = False
@@ -4,7 +4,8 @@ import json
 from datetime import datetime
 from pathlib import Path
 
-from metagen.metadata.dcat_us import INSUFFICIENT, PLACEHOLDER
+from metagen.metadata.model import INSUFFICIENT, PLACEHOLDER
+from metagen.records import AiResult, ServiceInfo, ThemeResult
 
 _GAP_FIELDS = [
     ("description", "Not available in WSDL"),
@@ -29,12 +30,68 @@ _MAPPED_FIELDS = [
     ("accessLevel", "Defaulted to 'public'", "OK"),
 ]
 
+# Same rows for records read from FGDC / ISO metadata; None statuses are resolved at runtime
+_SOURCE_MAPPED_FIELDS = [
+    ("title", "Source metadata title", "OK"),
+    ("identifier", None, None),
+    ("distribution.accessURL", "Source online linkage", None),
+    ("distribution.format", "Not stated in source linkage — omitted", "PARTIAL"),
+    ("distribution.mediaType", "Not stated in source linkage — omitted", "PARTIAL"),
+    ("publisher.name", "Source originator / contact organisation", None),
+    ("keyword", None, None),
+    ("accessLevel", "Defaulted to 'public'", "OK"),
+]
+
+
+def _usable(val) -> bool:
+    return val is not None and val != INSUFFICIENT
+
+
+def _summarize(val) -> str:
+    """One-line, length-capped rendering of a field value for report tables."""
+    if isinstance(val, dict):
+        summary = json.dumps(val, ensure_ascii=False)
+    elif isinstance(val, list):
+        summary = ", ".join(str(v) for v in val)
+    else:
+        summary = str(val)
+    if len(summary) > 80:
+        summary = summary[:77] + "..."
+    return summary
+
+
+def classify_gap_fields(
+    info: ServiceInfo,
+    ai_results: AiResult | None = None,
+    themes: ThemeResult | None = None,
+) -> dict[str, str]:
+    """Return each DCAT-US gap field's status: "source", "local", "ai" or "gap".
+
+    "source" means the value came from existing metadata (info.source_values),
+    which takes precedence over an AI suggestion for the same field. "local"
+    marks a theme assigned by the local classifier (metadata.themes).
+    """
+    source_values = info.source_values or AiResult()
+    ai = ai_results or AiResult()
+    statuses = {}
+    for field, _note in _GAP_FIELDS:
+        if _usable(source_values.get(field)):
+            statuses[field] = "source"
+        elif field == "theme" and themes is not None and themes.confident:
+            statuses[field] = "local"
+        elif _usable(ai.get(field)):
+            statuses[field] = "ai"
+        else:
+            statuses[field] = "gap"
+    return statuses
+
 
 def gap_report(
-    info: dict,
-    ai_results: dict | None = None,
+    info: ServiceInfo,
+    ai_results: AiResult | None = None,
     ai_metadata: dict | None = None,
     output_dir: Path | str | None = None,
+    themes: ThemeResult | None = None,
 ) -> tuple[str, Path]:
     """Build a tiered markdown gap report and write it to output_dir.
 
@@ -44,46 +101,76 @@ def gap_report(
       3. Remaining gaps — require manual input
 
     Args:
-        info: metadata dict from readers.wsdl.parse_wsdl()
+        info: ServiceInfo from readers.wsdl.parse_wsdl()
         ai_results: optional AI-suggested field values
         ai_metadata: optional dict describing the AI run (source, model, error, confidence)
         output_dir: directory to write the report into; defaults to docs/reports/
                     relative to the project root
+        themes: optional ThemeResult from metadata.themes.classify_corpus()
 
     Returns:
         (markdown_content, report_path)
     """
-    ai = ai_results or {}
+    ai = ai_results or AiResult()
     meta = ai_metadata or {}
     confidence = meta.get("confidence", {})
 
     # Resolve mapped field statuses
     mapped = []
-    for field, source, status in _MAPPED_FIELDS:
-        if field == "publisher.name":
-            status = "OK" if info.get("publisher_name") else "PARTIAL"
-        mapped.append((field, source, status))
+    if info.source_standard:
+        for field, source, status in _SOURCE_MAPPED_FIELDS:
+            if field == "identifier":
+                if info.file_identifier:
+                    source, status = "Source file identifier", "OK"
+                else:
+                    source = "Source online linkage"
+                    status = "OK" if info.endpoint_url else "PARTIAL"
+            elif field == "distribution.accessURL":
+                status = "OK" if info.endpoint_url else "PARTIAL"
+            elif field == "publisher.name":
+                status = "OK" if info.publisher_name else "PARTIAL"
+            elif field == "keyword":
+                if info.keywords:
+                    source, status = "Source metadata keywords", "OK"
+                else:
+                    source, status = "Defaulted to 'geospatial'", "PARTIAL"
+            mapped.append((field, source, status))
+    else:
+        for field, source, status in _MAPPED_FIELDS:
+            if field == "publisher.name":
+                status = "OK" if info.publisher_name else "PARTIAL"
+            elif field == "keyword" and themes is not None and themes.keywords:
+                source = "Derived from service name and ranked service terms"
+            mapped.append((field, source, status))
 
-    # Classify gap fields as AI-filled or still a gap
+    # Classify gap fields as mapped from source metadata, AI-filled, or still a gap
+    statuses = classify_gap_fields(info, ai_results, themes)
+    source_values = info.source_values or AiResult()
+    source_problems = info.source_problems or {}
     ai_filled = []
     remaining_gaps = []
 
     for field, note in _GAP_FIELDS:
-        val = ai.get(field)
-        if val is not None and val != INSUFFICIENT:
-            if isinstance(val, dict):
-                summary = json.dumps(val, ensure_ascii=False)
-            elif isinstance(val, list):
-                summary = ", ".join(str(v) for v in val)
-            else:
-                summary = str(val)
-            if len(summary) > 80:
-                summary = summary[:77] + "..."
-
+        status = statuses[field]
+        if status == "source":
+            mapped.append((field, f"Source metadata: {_summarize(source_values.get(field))}", "OK"))
+        elif status == "local":
+            mapped.append((
+                field,
+                f"Local classifier ({themes.confidence:.0%}): {_summarize(list(themes.themes))}",
+                "OK",
+            ))
+        elif status == "ai":
             field_conf = confidence.get(field, {})
             level = field_conf.get("level", "N/A").upper()
             reason = field_conf.get("reason", "")
-            ai_filled.append((field, summary, level, reason))
+            ai_filled.append((field, _summarize(ai.get(field)), level, reason))
+        elif field in source_problems:
+            remaining_gaps.append((
+                field, f"Invalid in source metadata ({source_problems[field]}) — requires manual input"
+            ))
+        elif info.source_standard:
+            remaining_gaps.append((field, "Not available in source metadata — requires manual input"))
         else:
             remaining_gaps.append((field, f"{note} — requires manual input"))
 
@@ -96,18 +183,28 @@ def gap_report(
     else:
         ai_status = "Disabled"
 
+    standard = info.source_standard
+    if standard:
+        heading = f"{standard} Crosswalk"
+        source_type = f"{standard} {info.source_version or ''}".strip()
+        mapped_from = "source metadata"
+    else:
+        heading = "ESRI WSDL Crosswalk"
+        source_type = "ESRI ArcGIS MapServer WSDL"
+        mapped_from = "WSDL"
+
     lines = [
-        "# DCAT-US Gap Report: ESRI WSDL Crosswalk",
+        f"# DCAT-US Gap Report: {heading}",
         "",
         "## Source Information",
         "",
         "| Property | Value |",
         "|---|---|",
-        f"| **Source file type** | ESRI ArcGIS MapServer WSDL |",
-        f"| **Service name** | `{info.get('service_name', 'N/A')}` |",
-        f"| **Endpoint URL** | `{info.get('endpoint_url', 'N/A')}` |",
-        f"| **ESRI namespace** | `{info.get('target_namespace', 'N/A')}` |",
-        f"| **Operations found** | {len(info.get('operations', []))} |",
+        f"| **Source file type** | {source_type} |",
+        f"| **Service name** | `{info.service_name or 'N/A'}` |",
+        f"| **Endpoint URL** | `{info.endpoint_url or 'N/A'}` |",
+        f"| **{'Namespace' if standard else 'ESRI namespace'}** | `{info.target_namespace or 'N/A'}` |",
+        f"| **Operations found** | {len(info.operations)} |",
         f"| **AI enrichment** | {ai_status} |",
     ]
 
@@ -116,10 +213,25 @@ def gap_report(
             f"| **AI bot** | {meta.get('bot', 'unknown')} |",
             f"| **AI model** | {meta.get('model', 'unknown')} |",
         ]
+        if "latency" in meta:
+            lines.append(f"| **AI latency** | {meta['latency']:.1f}s |")
+        repair = meta.get("repair")
+        if repair and repair.get("rounds"):
+            lines.append(
+                f"| **AI repairs** | {repair['rounds']} follow-up(s); "
+                f"{len(repair['repaired'])} field(s) recovered, "
+                f"{len(repair['unresolved'])} dropped |"
+            )
+        hedge = meta.get("hedge")
+        if hedge:
+            hedge_note = "hedge fired" if hedge.get("hedged") else "hedge not needed"
+            lines.append(
+                f"| **AI hedging** | {hedge['primary']} → {hedge['secondary']} ({hedge_note}) |"
+            )
 
     lines += [
         "",
-        "## Mapped Fields (extracted from WSDL)",
+        f"## Mapped Fields (extracted from {mapped_from})",
         "",
         "| Status | DCAT-US Field | Source |",
         "|---|---|---|",
@@ -155,7 +267,7 @@ def gap_report(
         "",
         "## Summary",
         "",
-        f"- **{len(mapped)}** fields mapped from the WSDL",
+        f"- **{len(mapped)}** fields mapped from the {mapped_from}",
     ]
     if ai_filled:
         lines.append(f"- **{len(ai_filled)}** fields filled by AI")
@@ -170,7 +282,7 @@ def gap_report(
     body = "\n".join(lines)
 
     # Prepend Hugo front matter so the report is listed by {{< section >}}
-    service_name = info.get("service_name", "Unknown Service")
+    service_name = info.service_name or "Unknown Service"
     iso_ts = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
     front_matter = (
         "---\n"
@@ -180,6 +292,12 @@ def gap_report(
     )
     md_content = front_matter + body
 
+    report_path = _write_report(md_content, output_dir, "gap_report")
+    return md_content, report_path
+
+
+def _write_report(md_content: str, output_dir: Path | str | None, prefix: str) -> Path:
+    """Write a timestamped markdown report and return its path."""
     # Resolve output directory
     if output_dir is None:
         # Walk up from this file to find the project root (contains pyproject.toml)
@@ -195,7 +313,117 @@ def gap_report(
     output_dir.mkdir(parents=True, exist_ok=True)
 
     timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-    report_path = output_dir / f"gap_report_{timestamp}.md"
+    report_path = output_dir / f"{prefix}_{timestamp}.md"
     report_path.write_text(md_content, encoding="utf-8")
+    return report_path
+
+
+# ---------------------------------------------------------------------------
+# Aggregate gap statistics for multi-record runs
+# ---------------------------------------------------------------------------
+
+def new_gap_stats() -> dict:
+    """Return an empty, JSON-serializable gap statistics accumulator."""
+    return {
+        "records": 0,
+        "standards": {},
+        "fields": {
+            field: {"source": 0, "local": 0, "ai": 0, "gap": 0} for field, _note in _GAP_FIELDS
+        },
+    }
+
+
+def update_gap_stats(
+    stats: dict,
+    info: ServiceInfo,
+    ai_results: AiResult | None = None,
+    themes: ThemeResult | None = None,
+) -> None:
+    """Count one record's gap field statuses into *stats* in place."""
+    stats["records"] += 1
+    standard = info.source_standard or "ESRI ArcGIS MapServer WSDL"
+    stats["standards"][standard] = stats["standards"].get(standard, 0) + 1
+    for field, status in classify_gap_fields(info, ai_results, themes).items():
+        stats["fields"][field][status] += 1
+
+
+def merge_gap_stats(a: dict, b: dict) -> dict:
+    """Return the sum of two gap statistics dicts (e.g. from separate shards)."""
+    merged = new_gap_stats()
+    for stats in (a, b):
+        merged["records"] += stats["records"]
+        for standard, count in stats["standards"].items():
+            merged["standards"][standard] = merged["standards"].get(standard, 0) + count
+        for field, counts in stats["fields"].items():
+            for status, n in counts.items():
+                merged["fields"][field][status] += n
+    return merged
+
+
+def gap_summary_report(
+    stats: dict,
+    output_dir: Path | str | None = None,
+) -> tuple[str, Path]:
+    """Build a markdown summary of aggregate gap statistics and write it to output_dir.
+
+    One report covers the whole run instead of one file per record.
+
+    Returns:
+        (markdown_content, report_path)
+    """
+    total = stats["records"]
+
+    def pct(n: int) -> str:
+        return f"{100 * n / total:.1f}%" if total else "0.0%"
+
+    lines = [
+        "# DCAT-US Gap Summary",
+        "",
+        "## Source Information",
+        "",
+        "| Source standard | Records |",
+        "|---|---|",
+    ]
+    for standard, count in sorted(stats["standards"].items()):
+        lines.append(f"| {standard} | {count} |")
+    lines += [
+        f"| **Total** | **{total}** |",
+        "",
+        "## Gap Fields",
+        "",
+        "| DCAT-US Field | From source | Local classifier | AI-filled | Remaining gaps |",
+        "|---|---|---|---|---|",
+    ]
+    for field, _note in _GAP_FIELDS:
+        counts = stats["fields"][field]
+        local = counts.get("local", 0)
+        lines.append(
+            f"| `{field}` | {counts['source']} ({pct(counts['source'])}) "
+            f"| {local} ({pct(local)}) "
+            f"| {counts['ai']} ({pct(counts['ai'])}) "
+            f"| {counts['gap']} ({pct(counts['gap'])}) |"
+        )
+
+    complete = sum(1 for counts in stats["fields"].values() if counts["gap"] == 0)
+    lines += [
+        "",
+        "## Summary",
+        "",
+        f"- **{total}** records crosswalked",
+        f"- **{complete}** of {len(_GAP_FIELDS)} gap fields resolved for every record",
+        "",
+        f"Fields marked with `{PLACEHOLDER}` in the output JSON must be filled in manually.",
+        "",
+    ]
+
+    iso_ts = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    front_matter = (
+        "---\n"
+        f'title: "Gap Summary: {total} records"\n'
+        f"date: {iso_ts}\n"
+        "---\n\n"
+    )
+    md_content = front_matter + "\n".join(lines)
 
+    report_path = _write_report(md_content, output_dir, "gap_report")
     return md_content, report_path
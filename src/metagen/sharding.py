@@ -0,0 +1,43 @@
+"""Deterministic corpus sharding — splits a crosswalk run across machines.
+
+Each service is assigned to a shard by hashing a stable key (its endpoint
+URL, or with --cluster clustering.cluster_shard_key()), so every node
+computes the same assignment independently and no coordinator is needed. Shards are numbered 1..N on the command line.
+"""
+
+import hashlib
+import re
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse a "K/N" shard spec into (K, N), with 1 <= K <= N.
+
+    Raises:
+        ValueError: if the spec is malformed or out of range.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec)
+    if not match:
+        raise ValueError(f"expected K/N (e.g. 1/4), got {spec!r}")
+    shard, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= shard <= count:
+        raise ValueError(f"shard must satisfy 1 <= K <= N, got {shard}/{count}")
+    return shard, count
+
+
+def shard_index(key: str, count: int) -> int:
+    """Return the 0-based shard for *key* out of *count* shards.
+
+    Uses SHA-1 rather than hash(), which is salted per process.
+    """
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count
+
+
+def in_shard(key: str, shard: int, count: int) -> bool:
+    """True if *key* belongs to 1-based shard *shard* of *count*."""
+    return shard_index(key, count) == shard - 1
+
+
+def shard_label(shard: int, count: int) -> str:
+    """File-name label for a shard, e.g. "shard-2-of-8"."""
+    return f"shard-{shard}-of-{count}"
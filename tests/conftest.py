@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+WSDL_TEMPLATE = """\
+<?xml version="1.0" encoding="utf-8"?>
+<definitions xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/" \
+xmlns:e="http://www.esri.com/schemas/ArcGIS/3.5.0" xmlns="http://schemas.xmlsoap.org/wsdl/" \
+targetNamespace="http://www.esri.com/schemas/ArcGIS/3.5.0">
+  <portType name="MapServerPort">
+    <operation name="ExportMapImage" />
+    <operation name="Find" />
+  </portType>
+  <service name="{name}_MapServer">
+    <port name="MapServerPort" binding="e:MapServerBinding">
+      <soap:address location="https://{host}/arcx/services/EDW/{name}/MapServer" />
+    </port>
+  </service>
+</definitions>
+"""
+
+
+def _wsdl_text(name: str, host: str = "apps.fs.usda.gov") -> str:
+    """A minimal ESRI MapServer WSDL for service *name* hosted on *host*."""
+    return WSDL_TEMPLATE.format(name=name, host=host)
+
+
+@pytest.fixture
+def wsdl_text():
+    """The _wsdl_text(name, host) helper, for tests that build their own corpus."""
+    return _wsdl_text
+
+
+@pytest.fixture
+def wsdl_dir(tmp_path):
+    """A directory of eight small WSDL files."""
+    corpus = tmp_path / "wsdls"
+    corpus.mkdir()
+    for i in range(1, 9):
+        (corpus / f"EDW_Layer{i}.xml").write_text(_wsdl_text(f"EDW_Layer{i}_01"), encoding="utf-8")
+    return corpus
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmp_path):
+    """Keep tests off the network and out of docs/reports/."""
+    import metagen.cli.main
+    import metagen.reports.gap
+
+    monkeypatch.setattr(metagen.cli.main, "_fetch_rest", lambda info: None)
+
+    reports = tmp_path / "reports"
+    write_report = metagen.reports.gap._write_report
+    monkeypatch.setattr(
+        metagen.reports.gap,
+        "_write_report",
+        lambda md, output_dir, prefix: write_report(md, output_dir or reports, prefix),
+    )
+
+
+class FakeBot:
+    """Stands in for gap_filler._call_bot(), replaying canned responses in order.
+
+    Bots named in *fail* raise; a bot with an Event in *block* waits for it
+    before answering, like a slow backend.
+    """
+
+    def __init__(self, *responses, fail=(), block=None):
+        self.responses = list(responses)
+        self.fail = set(fail)
+        self.block: dict[str, threading.Event] = block or {}
+        self.calls = []
+
+    def __call__(self, bot, conversation, max_tokens=None):
+        self.calls.append((bot, conversation, max_tokens))
+        if bot in self.block:
+            self.block[bot].wait()
+        if bot in self.fail or not self.responses:
+            raise RuntimeError(f"{bot} unavailable")
+        return self.responses.pop(0), f"{bot}-model"
+
+
+@pytest.fixture
+def fake_bot(monkeypatch):
+    """Install a FakeBot as gap_filler._call_bot; call with its responses."""
+    from metagen.llm import gap_filler
+
+    def install(*responses, fail=(), block=None):
+        fake = FakeBot(*responses, fail=fail, block=block)
+        monkeypatch.setattr(gap_filler, "_call_bot", fake)
+        return fake
+    return install
@@ -0,0 +1,91 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from metagen.cli.main import main
+from metagen.readers.archive import (
+    archive_stem,
+    is_archive,
+    iter_archive_members,
+    iter_directory_members,
+    parse_wsdl_members,
+)
+
+NAMES = ["EDW_Roads_01", "EDW_Trails_01", "EDW_Streams_01"]
+
+
+def _members(wsdl_text):
+    members = [(f"edw/{name}.xml", wsdl_text(name).encode("utf-8")) for name in NAMES]
+    return members + [("edw/README.txt", b"not a wsdl")]
+
+
+def _write_zip(path, members):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("edw/", b"")
+        for name, content in members:
+            zf.writestr(name, content)
+    return path
+
+
+def _write_tar(path, members):
+    with tarfile.open(path, "w:gz") as tf:
+        for name, content in members:
+            entry = tarfile.TarInfo(name)
+            entry.size = len(content)
+            tf.addfile(entry, io.BytesIO(content))
+    return path
+
+
+@pytest.fixture(params=["wsdls.zip", "wsdls.tar.gz"])
+def archive(request, tmp_path, wsdl_text):
+    write = _write_zip if request.param.endswith(".zip") else _write_tar
+    return write(tmp_path / request.param, _members(wsdl_text))
+
+
+def test_archive_names():
+    assert is_archive("a/wsdls.TAR.GZ") and is_archive("wsdls.zip")
+    assert not is_archive("wsdls.xml")
+    assert archive_stem("wsdls.tar.gz") == "wsdls"
+    assert archive_stem("wsdls.tgz") == "wsdls"
+
+
+def test_iter_archive_members_yields_wsdl_files_in_order(archive, wsdl_text):
+    members = list(iter_archive_members(archive))
+    assert [name for name, _content in members] == [f"edw/{name}.xml" for name in NAMES]
+    assert members[0][1] == wsdl_text("EDW_Roads_01").encode("utf-8")
+
+
+def test_iter_directory_members_uses_relative_posix_names(tmp_path, wsdl_text):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "Roads.wsdl").write_text(wsdl_text("Roads"), encoding="utf-8")
+    (tmp_path / "a.xml").write_text(wsdl_text("A"), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("x", encoding="utf-8")
+    assert [name for name, _ in iter_directory_members(tmp_path)] == ["a.xml", "b/Roads.wsdl"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_wsdl_members_skips_malformed_and_keeps_order(wsdl_text, capsys, workers):
+    members = [(f"{name}.xml", wsdl_text(name).encode("utf-8")) for name in NAMES]
+    members.insert(1, ("broken.xml", b"<definitions><service"))
+
+    parsed = list(parse_wsdl_members(iter(members), workers=workers))
+
+    assert [name for name, _info in parsed] == [f"{name}.xml" for name in NAMES]
+    assert [info.service_name for _name, info in parsed] == [f"{name}_MapServer" for name in NAMES]
+    assert "skipping broken.xml" in capsys.readouterr().err
+
+
+def test_crosswalk_archive_into_missing_output_directory(archive, tmp_path):
+    out = tmp_path / "out" / "nested" / "all.json"
+    result = CliRunner().invoke(main, [
+        "crosswalk", str(archive), str(out), "--workers", "2",
+        "--output-archive", str(tmp_path / "zips" / "per_service.zip"),
+    ])
+    assert result.exit_code == 0, result.output
+    assert "(3 records)" in result.output
+    assert out.with_suffix(".gap_stats.json").exists()
+    with zipfile.ZipFile(tmp_path / "zips" / "per_service.zip") as zf:
+        assert sorted(zf.namelist()) == sorted(f"edw/{name}_dcat_us.json" for name in NAMES)
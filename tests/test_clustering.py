@@ -0,0 +1,72 @@
+import io
+
+from metagen.clustering import (
+    SharedValues,
+    cluster_services,
+    cluster_shard_key,
+    normalize_name,
+    shared_values,
+)
+from metagen.readers.wsdl import parse_wsdl
+from metagen.records import AiResult
+
+
+def _service(wsdl_text, name, host="apps.fs.usda.gov"):
+    return parse_wsdl(io.BytesIO(wsdl_text(name, host).encode("utf-8"))), None
+
+
+def test_normalize_name_drops_version_suffixes():
+    assert normalize_name("EDW_Roads_02_MapServer") == "edw_roads"
+    assert normalize_name("EDW_Svc10") == "edw_svc10"
+
+
+def test_versions_of_one_service_cluster(wsdl_text):
+    services = [
+        _service(wsdl_text, "EDW_Roads_01"),
+        _service(wsdl_text, "EDW_Trails_01"),
+        _service(wsdl_text, "EDW_Roads_02"),
+    ]
+    assert cluster_services(services) == [0, 1, 0]
+
+
+def test_services_from_different_organisations_never_cluster(wsdl_text):
+    usfs = _service(wsdl_text, "Roads", "apps.fs.usda.gov")
+    blm = _service(wsdl_text, "Roads", "gis.blm.gov")
+    assert usfs[0].domain != blm[0].domain
+    assert cluster_services([usfs, blm, _service(wsdl_text, "Roads_02", "gis.blm.gov")]) == [0, 1, 1]
+
+
+def test_shared_values_copies_only_organisation_fields():
+    result = AiResult.from_dict({
+        "description": "Roads.",
+        "spatial": "-120,40,-119,41",
+        "license": "https://creativecommons.org/publicdomain/zero/1.0/",
+        "bureauCode": ["005:96"],
+    })
+    shared = shared_values(result)
+    assert shared.get("license") == result.get("license")
+    assert shared.get("bureauCode") == ["005:96"]
+    assert shared.get("description") is None and shared.get("spatial") is None
+
+
+def test_cluster_shard_key_ignores_version_suffix(wsdl_text):
+    roads_01, _ = _service(wsdl_text, "EDW_Roads_01")
+    roads_02, _ = _service(wsdl_text, "EDW_Roads_02")
+    blm_roads, _ = _service(wsdl_text, "EDW_Roads_01", "gis.blm.gov")
+    assert cluster_shard_key(roads_01) == cluster_shard_key(roads_02)
+    assert cluster_shard_key(roads_01) != cluster_shard_key(blm_roads)
+
+
+def test_shared_values_are_handed_out_then_dropped():
+    sharing = SharedValues([0, 1, 0, 0])
+    result = AiResult.from_dict({"description": "Roads.", "license": "CC0"})
+    sharing.add(0, "Roads_01", result)
+    sharing.add(1, "Trails_01", result)
+    assert sharing.is_member(2) and not sharing.is_member(1)
+
+    name, values = sharing.take(2)
+    assert name == "Roads_01"
+    assert values.get("license") == "CC0" and values.get("description") is None
+    sharing.take(3)
+    assert sharing.members == 2
+    assert not sharing._values and not sharing._remaining
@@ -0,0 +1,160 @@
+import json
+import zipfile
+
+from click.testing import CliRunner
+
+from metagen.cli.main import _output_stem, main
+
+
+def _crosswalk(*args):
+    result = CliRunner().invoke(main, ["crosswalk", *map(str, args)])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_output_stem_keeps_directories_and_stays_relative():
+    used = set()
+    assert _output_stem("a/Roads.xml", used) == "a/Roads"
+    assert _output_stem("b/Roads.xml", used) == "b/Roads"
+    assert _output_stem("a/Roads.wsdl", used) == "a/Roads_2"
+    assert _output_stem("../../etc/Roads.xml", used) == "etc/Roads"
+    assert _output_stem("/abs/Trails.xml", used) == "abs/Trails"
+
+
+def _same_name_corpus(tmp_path, wsdl_text):
+    corpus = tmp_path / "wsdls"
+    for folder, host in (("a", "apps.fs.usda.gov"), ("b", "gis.blm.gov")):
+        (corpus / folder).mkdir(parents=True)
+        (corpus / folder / "Roads.xml").write_text(wsdl_text("Roads", host), encoding="utf-8")
+    return corpus
+
+
+def test_same_file_name_in_different_folders_writes_both(tmp_path, wsdl_text):
+    corpus = _same_name_corpus(tmp_path, wsdl_text)
+    out = tmp_path / "out" / "all.json"
+    out.parent.mkdir()
+    _crosswalk(corpus, out, "--formats", "dcat-us,iso19115")
+
+    written = sorted(p.relative_to(out.parent).as_posix() for p in out.parent.rglob("*_iso19115.xml"))
+    assert written == ["a/Roads_iso19115.xml", "b/Roads_iso19115.xml"]
+    assert "gis.blm.gov" in (out.parent / "b/Roads_iso19115.xml").read_text(encoding="utf-8")
+
+
+def test_same_file_name_in_different_folders_archive(tmp_path, wsdl_text):
+    corpus = _same_name_corpus(tmp_path, wsdl_text)
+    archive = tmp_path / "outputs.zip"
+    _crosswalk(
+        corpus, tmp_path / "all.json", "--output-archive", archive,
+        "--formats", "dcat-us,iso19115,fgdc",
+    )
+
+    with zipfile.ZipFile(archive) as zf:
+        names = zf.namelist()
+        assert len(names) == len(set(names))
+        assert sorted(names) == [
+            "a/Roads_dcat_us.json", "a/Roads_fgdc.xml", "a/Roads_iso19115.xml",
+            "b/Roads_dcat_us.json", "b/Roads_fgdc.xml", "b/Roads_iso19115.xml",
+        ]
+        catalog = json.loads(zf.read("b/Roads_dcat_us.json"))
+    assert "gis.blm.gov" in catalog["dataset"][0]["distribution"][0]["accessURL"]
+
+
+ANSWERS = {
+    "description": "Road centerlines.",
+    "modified": "2024-01-15",
+    "contactPoint": {"fn": "Forest Service", "hasEmail": "mailto:gis@usda.gov"},
+    "bureauCode": ["005:96"],
+    "programCode": ["005:059"],
+    "license": "https://creativecommons.org/publicdomain/zero/1.0/",
+    "spatial": "-124.8,24.5,-66.9,49.4",
+    "temporal": "2020-01-01/2024-12-31",
+    "theme": ["transportation"],
+}
+
+
+def _roads_corpus(tmp_path, wsdl_text, names=("EDW_Roads_01", "EDW_Roads_02")):
+    corpus = tmp_path / "wsdls"
+    corpus.mkdir()
+    for name in names:
+        (corpus / f"{name}.xml").write_text(wsdl_text(name), encoding="utf-8")
+    return corpus
+
+
+def _record_requests(monkeypatch):
+    import metagen.llm.gap_filler
+    from metagen.records import AiResult
+
+    requests = []
+
+    def fake_gap_fill(info, rest_info=None, skip_fields=frozenset(), **kwargs):
+        requests.append(info.service_name)
+        return AiResult.from_dict(ANSWERS), {"source": "ai", "bot": "verde", "latency": 0.0}
+
+    monkeypatch.setattr(metagen.llm.gap_filler, "ai_gap_fill", fake_gap_fill)
+    return requests
+
+
+def test_cluster_members_make_no_ai_request(tmp_path, wsdl_text, monkeypatch):
+    import metagen.cli.main
+    from metagen.records import RestEnrichment
+
+    requests = _record_requests(monkeypatch)
+    description = "<p>Forest Service <b>road</b> centerlines.</p>"
+    rest = {
+        "EDW_Roads_02_MapServer": RestEnrichment(
+            service_description=description,
+            full_extent={"xmin": -120, "ymin": 40, "xmax": -119, "ymax": 41,
+                         "spatialReference": {"wkid": 4326}},
+        ),
+    }
+    monkeypatch.setattr(
+        metagen.cli.main, "_fetch_rest",
+        lambda info: rest.get(info.service_name, RestEnrichment(service_description=description)),
+    )
+
+    corpus = _roads_corpus(tmp_path, wsdl_text, ("EDW_Roads_01", "EDW_Roads_02", "EDW_Roads_03"))
+    result = _crosswalk(corpus, tmp_path / "all.json", "--ai", "--cluster")
+
+    assert requests == ["EDW_Roads_01_MapServer"]
+    assert "sharing representative values: 2 of 3 services (2 AI requests saved)" in result.output
+
+    catalog = json.loads((tmp_path / "all.json").read_text(encoding="utf-8"))
+    first, second, third = catalog["dataset"]
+    for name in ("contactPoint", "license", "bureauCode", "programCode"):
+        assert second[name] == third[name] == first[name]
+    # Per-service fields come from REST metadata or stay gaps, never from the representative
+    assert first["description"] == ANSWERS["description"]
+    assert second["description"] == third["description"] == "Forest Service road centerlines."
+    assert second["spatial"] == "-120.0000,40.0000,-119.0000,41.0000"
+    assert third.get("spatial") != first["spatial"]
+    assert second.get("temporal") != first["temporal"]
+
+    stats = json.loads((tmp_path / "all.gap_stats.json").read_text(encoding="utf-8"))
+    assert stats["fields"]["description"] == {"source": 2, "local": 0, "ai": 1, "gap": 0}
+    assert stats["fields"]["spatial"] == {"source": 1, "local": 0, "ai": 1, "gap": 1}
+    assert stats["fields"]["license"]["ai"] == 3
+
+
+def test_cluster_sharding_keeps_versions_together(tmp_path, wsdl_text, monkeypatch):
+    _record_requests(monkeypatch)
+    names = [f"EDW_{base}_0{v}" for base in ("Roads", "Trails", "Streams", "Lakes") for v in (1, 2)]
+    corpus = _roads_corpus(tmp_path, wsdl_text, names)
+
+    for k in (1, 2):
+        _crosswalk(corpus, tmp_path / "out.json", "--ai", "--cluster", "--shard", f"{k}/2")
+    for k in (1, 2):
+        stats = json.loads(
+            (tmp_path / f"out.shard-{k}-of-2.gap_stats.json").read_text(encoding="utf-8")
+        )
+        assert stats["shard_key"] == "cluster"
+        catalog = json.loads((tmp_path / f"out.shard-{k}-of-2.json").read_text(encoding="utf-8"))
+        titles = [d["identifier"].split("/")[-2] for d in catalog["dataset"]]
+        assert sorted(t[:-3] for t in titles[0::2]) == sorted(t[:-3] for t in titles[1::2])
+
+    _crosswalk(corpus, tmp_path / "plain.json", "--shard", "2/2")
+    result = CliRunner().invoke(main, [
+        "merge", str(tmp_path / "out.shard-1-of-2.json"), str(tmp_path / "plain.shard-2-of-2.json"),
+        "-o", str(tmp_path / "merged.json"),
+    ])
+    assert result.exit_code != 0
+    assert "with and without --cluster" in result.output
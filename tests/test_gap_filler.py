@@ -0,0 +1,205 @@
+import json
+
+import pytest
+
+from metagen.llm import gap_filler
+from metagen.llm.gap_filler import (
+    REPAIR_TOKENS_PER_FIELD,
+    ai_gap_fill,
+    parse_ai_response,
+    repair_max_tokens,
+)
+from metagen.metadata.dcat_us import validate_gap_fields
+from metagen.records import ServiceInfo
+
+VALID = {
+    "description": "Road centerlines.",
+    "modified": "2024-01-15",
+    "contactPoint": {"fn": "Forest Service", "hasEmail": "mailto:gis@usda.gov"},
+    "bureauCode": ["005:96"],
+    "programCode": ["005:059"],
+    "license": "https://creativecommons.org/publicdomain/zero/1.0/",
+    "spatial": "-124.8,24.5,-66.9,49.4",
+    "temporal": "2020-01-01/2024-12-31",
+    "theme": ["transportation"],
+}
+
+INFO = ServiceInfo(service_name="EDW_Roads_01_MapServer")
+
+
+@pytest.mark.parametrize("value", ["2024", "2024-01", "2024-01-15", "2024-01-15T10:30:00Z"])
+def test_valid_dates(value):
+    assert validate_gap_fields({"modified": value}, ["modified"]) == {}
+
+
+@pytest.mark.parametrize("value", ["Unknown", "15/01/2024", "2024-1-5", ""])
+def test_invalid_dates(value):
+    assert "modified" in validate_gap_fields({"modified": value}, ["modified"])
+
+
+@pytest.mark.parametrize(
+    "value", ["2020-01-01/2024-12-31", "R/2020-01-01/P1Y", "2020-01-01/P5Y", "P1M/2024-01-01"]
+)
+def test_valid_intervals(value):
+    assert validate_gap_fields({"temporal": value}, ["temporal"]) == {}
+
+
+@pytest.mark.parametrize("value", ["2020-2024", "2020-01-01", "R/2020-01-01", "ongoing"])
+def test_invalid_intervals(value):
+    assert "temporal" in validate_gap_fields({"temporal": value}, ["temporal"])
+
+
+@pytest.mark.parametrize(
+    "name, value, ok",
+    [
+        ("bureauCode", ["005:96"], True),
+        ("bureauCode", ["005:096"], False),
+        ("bureauCode", "005:96", False),
+        ("bureauCode", [], False),
+        ("programCode", ["005:059"], True),
+        ("programCode", ["005:59"], False),
+        ("spatial", "-180,-90,180,90", True),
+        ("spatial", "-124.8,49.4,-66.9,24.5", False),
+        ("spatial", "-20037508,-20037508,20037508,20037508", False),
+        ("spatial", "somewhere", False),
+        ("theme", ["inlandWaters", "biota"], True),
+        ("theme", ["roads"], False),
+        ("contactPoint", {"fn": "A", "hasEmail": "a@b.gov"}, False),
+        ("license", "public domain", False),
+        ("description", "   ", False),
+    ],
+)
+def test_field_rules(name, value, ok):
+    assert (validate_gap_fields({name: value}, [name]) == {}) is ok
+
+
+def test_insufficient_evidence_is_valid_and_missing_is_not():
+    values = {name: "INSUFFICIENT_EVIDENCE" for name in VALID}
+    assert validate_gap_fields(values) == {}
+    assert validate_gap_fields(VALID) == {}
+    assert validate_gap_fields({}) == {name: "missing" for name in VALID}
+
+
+def test_parse_ai_response_strips_fences_and_reports_decode_failure(capsys):
+    values, confidence = parse_ai_response(
+        "```json\n" + json.dumps({**VALID, "confidence": {"theme": {"level": "high"}}}) + "\n```"
+    )
+    assert values == VALID
+    assert confidence == {"theme": {"level": "high"}}
+
+    assert parse_ai_response("not json at all") == ({}, {})
+    assert "Could not parse" in capsys.readouterr().err
+
+
+def test_repair_asks_only_for_invalid_fields(fake_bot):
+    first = {**VALID, "modified": "last year", "bureauCode": ["96"]}
+    repair = {"modified": "2023-06-01", "bureauCode": ["005:96"]}
+    fake = fake_bot(json.dumps(first), json.dumps(repair))
+
+    result, meta = ai_gap_fill(INFO, bot="verde")
+
+    assert result.modified == "2023-06-01"
+    assert result.bureau_code == ["005:96"]
+    assert meta["repair"] == {"rounds": 1, "repaired": ["bureauCode", "modified"], "unresolved": {}}
+
+    # The first request is uncapped for verde; the repair is capped per field
+    assert fake.calls[0][2] is None
+    _bot, conversation, max_tokens = fake.calls[1]
+    assert max_tokens == 2 * REPAIR_TOKENS_PER_FIELD
+    # A fresh request: evidence plus the failing fields, no previous answer
+    [(role, message)] = conversation
+    assert role == "human"
+    assert '"modified"' in message and '"bureauCode"' in message
+    assert '"license"' not in message
+    assert "last year" not in message
+
+
+def test_values_still_invalid_after_repairs_are_dropped(fake_bot):
+    first = {**VALID, "spatial": "0,0,999,999"}
+    fake_bot(json.dumps(first), json.dumps({"spatial": "still wrong"}))
+
+    result, meta = ai_gap_fill(INFO, bot="verde", max_repairs=1)
+
+    assert result.spatial is None
+    assert result.license == VALID["license"]
+    assert list(meta["repair"]["unresolved"]) == ["spatial"]
+
+
+def test_no_repairs_when_disabled(fake_bot):
+    fake = fake_bot(json.dumps({**VALID, "theme": ["roads"]}))
+    result, meta = ai_gap_fill(INFO, bot="verde", max_repairs=0)
+    assert len(fake.calls) == 1
+    assert result.theme is None
+    assert meta["repair"]["rounds"] == 0
+
+
+def test_unparseable_response_is_repaired_with_the_full_cap(fake_bot):
+    fake = fake_bot("Sure! Here is the metadata you asked for:", json.dumps(VALID))
+    result, meta = ai_gap_fill(INFO, bot="verde")
+    assert result.filled_count() == 9
+    assert meta["repair"]["rounds"] == 1
+    # Every field failed, so the repair is as large as the original request
+    assert fake.calls[1][2] is None
+
+
+def test_repair_cap_scales_with_failing_fields():
+    fields = tuple(VALID)
+    assert repair_max_tokens({"spatial": "missing"}, fields) == REPAIR_TOKENS_PER_FIELD
+    assert repair_max_tokens(dict.fromkeys(fields[:8], "missing"), fields) == 2048
+    assert repair_max_tokens(dict.fromkeys(fields, "missing"), fields) is None
+    assert repair_max_tokens({"spatial": "missing"}, ("spatial",)) is None
+
+
+def test_unparseable_response_falls_back(fake_bot):
+    fake_bot("I cannot help with that.", "still not JSON")
+    result, meta = ai_gap_fill(INFO, bot="verde")
+    assert meta["source"] == "fallback"
+    assert result.filled_count() == 0
+
+
+def test_skip_fields_are_not_requested_or_repaired(fake_bot):
+    values = {k: v for k, v in VALID.items() if k != "theme"}
+    fake = fake_bot(json.dumps(values))
+    result, meta = ai_gap_fill(INFO, bot="verde", skip_fields=frozenset({"theme"}))
+    assert len(fake.calls) == 1
+    assert meta["repair"]["rounds"] == 0
+    assert "omit them from your answer: theme" in fake.calls[0][1][0][1]
+
+
+def test_verde_bot_passes_max_tokens(monkeypatch):
+    pytest.importorskip("langchain_litellm")
+    from metagen.llm import bots
+
+    seen = {}
+
+    class FakeChat:
+        def __init__(self, **kwargs):
+            seen.update(kwargs)
+
+        def invoke(self, message):
+            return bots._ChatResponse(content="{}")
+
+    monkeypatch.setattr(bots, "ChatLiteLLM", FakeChat)
+    gap_filler._call_bot("verde", [("human", "hi")], max_tokens=REPAIR_TOKENS_PER_FIELD)
+    assert seen["max_tokens"] == REPAIR_TOKENS_PER_FIELD
+
+    seen.clear()
+    gap_filler._call_bot("verde", [("human", "hi")])
+    assert "max_tokens" not in seen
+
+
+def test_claude_requests_default_to_the_full_cap(monkeypatch):
+    from types import SimpleNamespace
+
+    seen = {}
+
+    def create(**kwargs):
+        seen.update(kwargs)
+        return SimpleNamespace(content=[SimpleNamespace(text="{}")])
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(gap_filler, "_get_anthropic_client", lambda: client)
+    gap_filler._call_bot("claude", [("human", "hi")])
+    assert seen["max_tokens"] == gap_filler.MAX_TOKENS
+    gap_filler._call_bot("claude", [("human", "hi")], max_tokens=256)
+    assert seen["max_tokens"] == 256
@@ -0,0 +1,113 @@
+import json
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from metagen.llm import gap_filler
+from metagen.llm.gap_filler import ai_gap_fill
+from metagen.records import ServiceInfo
+
+INFO = ServiceInfo(service_name="EDW_Roads_01_MapServer")
+ANSWER = json.dumps({"description": "Road centerlines.", "theme": ["transportation"]})
+
+
+def _fill(**kwargs):
+    return ai_gap_fill(INFO, bot="verde", hedge_bot="claude", max_repairs=0, **kwargs)
+
+
+@pytest.fixture
+def hedge_pool(monkeypatch):
+    """A fresh two-thread hedge pool, shut down after the test."""
+    monkeypatch.setattr(gap_filler, "HEDGE_WORKERS", 2)
+    monkeypatch.setattr(gap_filler, "_hedge_executor", None)
+    yield
+    if gap_filler._hedge_executor is not None:
+        gap_filler._hedge_executor.shutdown(wait=True)
+
+
+def test_hedged_request_reports_metadata(fake_bot, hedge_pool):
+    # Regression: building the hedge metadata used to raise NameError
+    fake_bot(ANSWER)
+    result, meta = _fill(hedge_after=5)
+    assert meta["source"] == "ai"
+    assert meta["bot"] == "verde"
+    assert meta["hedge"]["hedged"] is False
+    assert meta["hedge"]["winner"] == "verde"
+    assert result.description == "Road centerlines."
+
+
+def test_hedge_fires_when_primary_fails(fake_bot, hedge_pool):
+    fake_bot(ANSWER, fail={"verde"})
+    _result, meta = _fill(hedge_after=5)
+    assert meta["bot"] == "claude"
+    assert meta["hedge"]["hedged"] is True
+    assert "verde" in meta["hedge"]["errors"]
+
+
+def test_hedge_failure_falls_back(fake_bot, hedge_pool):
+    fake_bot(fail={"verde", "claude"})
+    _result, meta = _fill(hedge_after=5)
+    assert meta["source"] == "fallback"
+    assert "claude unavailable" in meta["error"]
+
+
+def test_slow_primary_is_hedged_after_delay(fake_bot, hedge_pool):
+    slow = threading.Event()
+    fake_bot(ANSWER, block={"verde": slow})
+    try:
+        result, meta = _fill(hedge_after=0.05)
+    finally:
+        slow.set()
+    assert meta["bot"] == "claude"
+    assert meta["hedge"]["hedged"] is True
+    assert meta["hedge"]["latency"] < 1
+    assert result.description == "Road centerlines."
+
+
+def test_requests_share_one_bounded_pool(fake_bot, hedge_pool):
+    slow = threading.Event()
+    fake = fake_bot(ANSWER, ANSWER, ANSWER, block={"verde": slow})
+    # The first call leaves its losing primary running on one of the two threads
+    _fill(hedge_after=0.05)
+    pool = gap_filler._hedge_executor
+
+    # The second primary takes the last free thread, so its hedge has to
+    # wait until a losing request finishes: losers cannot pile up unbounded
+    threading.Timer(0.3, slow.set).start()
+    start = time.monotonic()
+    _result, meta = _fill(hedge_after=0.05)
+    assert time.monotonic() - start >= 0.25
+    assert meta["source"] == "ai"
+
+    assert gap_filler._hedge_executor is pool
+    threads = [t for t in threading.enumerate() if t.name.startswith("metagen-hedge")]
+    assert len(threads) <= 2
+    assert [bot for bot, _conversation, _tokens in fake.calls].count("verde") == 2
+
+
+def test_anthropic_client_has_request_timeout(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setitem(sys.modules, "anthropic", SimpleNamespace(Anthropic=lambda **kw: kw))
+    client = gap_filler._get_anthropic_client()
+    assert client["timeout"] == gap_filler.REQUEST_TIMEOUT
+
+
+def test_verde_bot_has_request_timeout(monkeypatch):
+    pytest.importorskip("langchain_litellm")
+    from metagen.llm import bots
+
+    seen = {}
+
+    class FakeChat:
+        def __init__(self, **kwargs):
+            seen.update(kwargs)
+
+        def invoke(self, message):
+            return bots._ChatResponse(content="{}")
+
+    monkeypatch.setattr(bots, "ChatLiteLLM", FakeChat)
+    gap_filler._call_bot("verde", [("human", "hi")])
+    assert seen["request_timeout"] == gap_filler.REQUEST_TIMEOUT
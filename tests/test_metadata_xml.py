@@ -0,0 +1,207 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from metagen.cli.main import main
+from metagen.metadata.model import PLACEHOLDER, build_record
+from metagen.readers.metadata_xml import iter_metadata_records
+from metagen.reports.gap import classify_gap_fields, gap_report
+
+FGDC_RECORD = """\
+<metadata>
+  <idinfo>
+    <citation><citeinfo>
+      <origin>Example Agency</origin>
+      <pubdate>{pubdate}</pubdate>
+      <title>Roads</title>
+      <onlink>https://example.gov/data/roads.zip</onlink>
+    </citeinfo></citation>
+    <descript><abstract>Road centerlines.</abstract></descript>
+    <ptcontac><cntinfo>
+      <cntorgp><cntorg>Example Agency</cntorg></cntorgp>
+    </cntinfo></ptcontac>
+  </idinfo>
+</metadata>
+"""
+
+
+def _read(tmp_path, pubdate):
+    path = tmp_path / "roads.xml"
+    path.write_text(FGDC_RECORD.format(pubdate=pubdate), encoding="utf-8")
+    [info] = iter_metadata_records(path)
+    return info
+
+
+def test_valid_source_values_are_kept(tmp_path):
+    info = _read(tmp_path, "20240115")
+    assert info.source_values.modified == "2024-01-15"
+    assert info.source_values.contact_point == {"fn": "Example Agency"}
+    assert info.source_problems is None
+
+
+def test_invalid_source_date_is_reported_as_gap(tmp_path, capsys):
+    info = _read(tmp_path, "Unknown")
+    assert info.source_values.modified is None
+    assert "modified" in info.source_problems
+    assert "ignoring invalid source modified" in capsys.readouterr().err
+
+    assert build_record(info).modified == PLACEHOLDER
+    assert classify_gap_fields(info)["modified"] == "gap"
+    md, path = gap_report(info, output_dir=tmp_path)
+    assert "Invalid in source metadata" in md
+    assert path.name.startswith("gap_report_")
+
+
+ISO_RECORD = """\
+<gmd:MD_Metadata xmlns:gmd="http://www.isotc211.org/2005/gmd"
+    xmlns:gco="http://www.isotc211.org/2005/gco" xmlns:gmx="http://www.isotc211.org/2005/gmx"
+    xmlns:gml="http://www.opengis.net/gml/3.2" xmlns:xlink="http://www.w3.org/1999/xlink">
+  <gmd:fileIdentifier><gco:CharacterString>{file_id}</gco:CharacterString></gmd:fileIdentifier>
+  <gmd:contact><gmd:CI_ResponsibleParty>
+    <gmd:organisationName><gco:CharacterString>Example Agency</gco:CharacterString></gmd:organisationName>
+  </gmd:CI_ResponsibleParty></gmd:contact>
+  <gmd:dateStamp><gco:Date>2023-06-01</gco:Date></gmd:dateStamp>
+  <gmd:identificationInfo><gmd:MD_DataIdentification>
+    <gmd:citation><gmd:CI_Citation>
+      <gmd:title><gmx:Anchor xlink:href="https://example.gov/id/{file_id}">{title}</gmx:Anchor></gmd:title>
+    </gmd:CI_Citation></gmd:citation>
+    <gmd:abstract><gco:CharacterString>Stream lines.</gco:CharacterString></gmd:abstract>
+    <gmd:pointOfContact><gmd:CI_ResponsibleParty>
+      <gmd:individualName><gmx:Anchor>Jane Doe</gmx:Anchor></gmd:individualName>
+      <gmd:contactInfo><gmd:CI_Contact><gmd:address><gmd:CI_Address>
+        <gmd:electronicMailAddress><gco:CharacterString>jane@example.gov</gco:CharacterString></gmd:electronicMailAddress>
+      </gmd:CI_Address></gmd:address></gmd:CI_Contact></gmd:contactInfo>
+    </gmd:CI_ResponsibleParty></gmd:pointOfContact>
+    <gmd:resourceConstraints><gmd:MD_LegalConstraints><gmd:otherConstraints>
+      <gmx:Anchor xlink:href="https://creativecommons.org/publicdomain/zero/1.0/">CC0</gmx:Anchor>
+    </gmd:otherConstraints></gmd:MD_LegalConstraints></gmd:resourceConstraints>
+    <gmd:topicCategory><gmd:MD_TopicCategoryCode>inlandWaters</gmd:MD_TopicCategoryCode></gmd:topicCategory>
+    <gmd:extent><gmd:EX_Extent>
+      <gmd:geographicElement><gmd:EX_GeographicBoundingBox>
+        <gmd:westBoundLongitude><gco:Decimal>-120</gco:Decimal></gmd:westBoundLongitude>
+        <gmd:eastBoundLongitude><gco:Decimal>-119</gco:Decimal></gmd:eastBoundLongitude>
+        <gmd:southBoundLatitude><gco:Decimal>40</gco:Decimal></gmd:southBoundLatitude>
+        <gmd:northBoundLatitude><gco:Decimal>41</gco:Decimal></gmd:northBoundLatitude>
+      </gmd:EX_GeographicBoundingBox></gmd:geographicElement>
+      <gmd:temporalElement><gmd:EX_TemporalExtent><gmd:extent><gml:TimePeriod gml:id="t">
+        <gml:beginPosition>2010-01-01</gml:beginPosition>
+        {end}
+      </gml:TimePeriod></gmd:extent></gmd:EX_TemporalExtent></gmd:temporalElement>
+    </gmd:EX_Extent></gmd:extent>
+  </gmd:MD_DataIdentification></gmd:identificationInfo>
+</gmd:MD_Metadata>
+"""
+
+
+def _iso(file_id="rec-1", title="Streams", end="<gml:endPosition>2020-12-31</gml:endPosition>"):
+    return ISO_RECORD.format(file_id=file_id, title=title, end=end)
+
+
+def test_iso_record_reads_anchor_and_character_string_text(tmp_path):
+    path = tmp_path / "streams.xml"
+    path.write_text(_iso(), encoding="utf-8")
+    [info] = iter_metadata_records(path)
+
+    assert info.title == "Streams"
+    assert info.file_identifier == "rec-1"
+    assert info.publisher_name == "Example Agency"
+    values = info.source_values
+    assert values.description == "Stream lines."
+    assert values.modified == "2023-06-01"
+    assert values.contact_point == {"fn": "Jane Doe", "hasEmail": "mailto:jane@example.gov"}
+    assert values.license == "https://creativecommons.org/publicdomain/zero/1.0/"
+    assert values.spatial == "-120.0,40.0,-119.0,41.0"
+    assert values.temporal == "2010-01-01/2020-12-31"
+    assert values.theme == ["inlandWaters"]
+    assert build_record(info).title == "Streams"
+
+
+def test_open_ended_ranges_are_left_as_gaps(tmp_path):
+    path = tmp_path / "iso.xml"
+    path.write_text(_iso(end='<gml:endPosition indeterminatePosition="now"/>'), encoding="utf-8")
+    [iso] = iter_metadata_records(path)
+    assert iso.source_values.temporal is None
+
+    fgdc = FGDC_RECORD.format(pubdate="20240115").replace(
+        "</descript>",
+        "</descript><timeperd><timeinfo><rngdates><begdate>2010</begdate>"
+        "<enddate>Present</enddate></rngdates></timeinfo></timeperd>",
+    )
+    path.write_text(fgdc, encoding="utf-8")
+    [info] = iter_metadata_records(path)
+    assert info.source_values.temporal is None
+    assert classify_gap_fields(info)["temporal"] == "gap"
+
+
+def test_fgdc_single_date_is_a_one_day_interval(tmp_path):
+    fgdc = FGDC_RECORD.format(pubdate="20240115").replace(
+        "</descript>",
+        "</descript><timeperd><timeinfo><sngdate><caldate>20190704</caldate>"
+        "</sngdate></timeinfo></timeperd>",
+    )
+    path = tmp_path / "roads.xml"
+    path.write_text(fgdc, encoding="utf-8")
+    [info] = iter_metadata_records(path)
+    assert info.source_values.temporal == "2019-07-04/2019-07-04"
+
+
+def _csw_dump(count):
+    records = "".join(_iso(f"rec-{i}", f"Streams {i}") for i in range(count))
+    return (
+        '<csw:GetRecordsResponse xmlns:csw="http://www.opengis.net/cat/csw/2.0.2">'
+        f"<csw:SearchResults>{records}</csw:SearchResults></csw:GetRecordsResponse>"
+    )
+
+
+def test_multi_record_dump_streams_and_detaches_records(tmp_path, monkeypatch):
+    import xml.etree.ElementTree as ET
+
+    import metagen.readers.metadata_xml as reader
+
+    path = tmp_path / "dump.xml"
+    path.write_text(_csw_dump(3), encoding="utf-8")
+
+    containers = []
+    iterparse = ET.iterparse
+
+    def spy(*args, **kwargs):
+        for event, elem in iterparse(*args, **kwargs):
+            if event == "start" and elem.tag.endswith("SearchResults"):
+                containers.append(elem)
+            yield event, elem
+
+    monkeypatch.setattr(reader.ET, "iterparse", spy)
+    titles = []
+    for i, info in enumerate(reader.iter_metadata_records(path)):
+        titles.append(info.title)
+        # Earlier records have been removed from the partial tree
+        assert len(containers[0]) <= 3 - i
+    assert titles == ["Streams 0", "Streams 1", "Streams 2"]
+    assert len(containers[0]) == 0
+
+
+def test_records_are_yielded_before_the_whole_file_is_read(tmp_path):
+    import xml.etree.ElementTree as ET
+
+    path = tmp_path / "truncated.xml"
+    path.write_text(_csw_dump(2)[:-40], encoding="utf-8")
+    records = iter_metadata_records(path)
+    assert next(records).title == "Streams 0"
+    assert next(records).title == "Streams 1"
+    with pytest.raises(ET.ParseError):
+        next(records)
+
+
+def test_crosswalk_metadata_dump(tmp_path):
+    path = tmp_path / "dump.xml"
+    path.write_text(_csw_dump(3), encoding="utf-8")
+    out = tmp_path / "out" / "catalog.json"
+
+    result = CliRunner().invoke(main, ["crosswalk-metadata", str(path), str(out)])
+    assert result.exit_code == 0, result.output
+    catalog = json.loads(out.read_text(encoding="utf-8"))
+    assert [d["title"] for d in catalog["dataset"]] == ["Streams 0", "Streams 1", "Streams 2"]
+    assert all(d["theme"] == ["inlandWaters"] for d in catalog["dataset"])
+    assert "(3 records)" in result.output
+    assert "ISO 19139" in result.output
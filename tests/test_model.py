@@ -0,0 +1,52 @@
+import pytest
+
+from metagen.metadata.dcat_us import dataset_from_record
+from metagen.metadata.model import DISTRIBUTION_FORMAT, build_record, split_interval
+from metagen.records import ServiceInfo
+
+
+def test_wsdl_distribution_describes_soap_endpoint():
+    info = ServiceInfo(
+        service_name="EDW_Roads_01_MapServer",
+        endpoint_url="https://example.gov/arcgis/services/EDW_Roads_01/MapServer",
+        operations=("ExportMapImage", "Find"),
+    )
+    dataset = dataset_from_record(build_record(info))
+    [distribution] = dataset["distribution"]
+    assert distribution["format"] == DISTRIBUTION_FORMAT
+    assert distribution["mediaType"] == "application/xml"
+    assert distribution["title"] == "EDW_Roads_01_MapServer (SOAP endpoint)"
+    assert "2 operations" in distribution["description"]
+    assert dataset["keyword"][:3] == ["geospatial", "map service", "ArcGIS"]
+
+
+def test_source_metadata_distribution_makes_no_soap_claim():
+    info = ServiceInfo(
+        service_name="Roads",
+        title="Roads",
+        endpoint_url="https://example.gov/data/roads.zip",
+        source_standard="FGDC CSDGM",
+    )
+    dataset = dataset_from_record(build_record(info))
+    [distribution] = dataset["distribution"]
+    assert "format" not in distribution
+    assert "mediaType" not in distribution
+    assert distribution["accessURL"] == "https://example.gov/data/roads.zip"
+    assert "SOAP" not in distribution["title"] + distribution["description"]
+    assert dataset["keyword"] == ["geospatial"]
+
+
+@pytest.mark.parametrize(
+    "temporal, expected",
+    [
+        ("2020-01-01/2024-12-31", ("2020-01-01", "2024-12-31")),
+        ("2020-01-01/P5Y", ("2020-01-01", "2025-01-01")),
+        ("2020-01-31/P1M", ("2020-01-31", "2020-02-29")),
+        ("P1M/2024-01-01", ("2023-12-01", "2024-01-01")),
+        ("R/2020-01-01/P1Y", ("2020-01-01", None)),
+        ("2020-01-01", None),
+        ("2020-01-01/", None),
+    ],
+)
+def test_split_interval(temporal, expected):
+    assert split_interval(temporal) == expected
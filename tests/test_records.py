@@ -0,0 +1,112 @@
+import json
+import re
+from pathlib import Path
+
+from metagen.llm.gap_filler import build_gap_fill_prompt
+from metagen.metadata.dcat_us import build_dcat_us
+from metagen.readers.rest import extract_enrichment
+from metagen.readers.wsdl import parse_wsdl
+from metagen.records import AiResult, LayerTable, RestEnrichment, ServiceInfo
+from metagen.reports.gap import gap_report
+
+DATA = Path(__file__).parent / "data"
+SAMPLE_WSDL = Path(__file__).parents[1] / "data" / "usfs" / "EDW_ActivityFactsCommonAttributes_01.xml"
+
+REST_JSON = {
+    "serviceDescription": "Activities recorded in FACTS.",
+    "description": "",
+    "documentInfo": {"Title": "Activity Facts", "Subject": "", "Author": "USFS", "Keywords": "activities, facts"},
+    "copyrightText": "USDA Forest Service",
+    "spatialReference": {"wkid": 102100},
+    "fullExtent": {"xmin": -1, "ymin": -1, "xmax": 1, "ymax": 1},
+    "capabilities": "Map,Query",
+    "layers": [{"id": 0, "name": "Activities", "type": "Feature Layer"}, {"name": "NoId"}],
+}
+
+AI_VALUES = {
+    "description": "Activity polygons.",
+    "modified": "2024-01-15",
+    "contactPoint": {"fn": "FS", "hasEmail": "mailto:fs@usda.gov"},
+    "bureauCode": ["005:96"],
+    "programCode": ["005:059"],
+    "license": "INSUFFICIENT_EVIDENCE",
+    "spatial": "-124.8,24.5,-66.9,49.4",
+    "temporal": "2020-01-01/2024-12-31",
+    "theme": ["environment"],
+}
+
+
+def test_service_info_round_trip():
+    info = ServiceInfo(
+        service_name="Roads",
+        title="Roads",
+        endpoint_url="https://example.gov/Roads/MapServer",
+        operations=("Find",),
+        domain="example.gov",
+        publisher_name="Example",
+        source_standard="FGDC CSDGM",
+        source_version="FGDC-STD-001-1998",
+        keywords=("roads",),
+        source_values=AiResult(modified="2024-01-15"),
+        source_problems={"spatial": "missing"},
+    )
+    assert ServiceInfo.from_dict(info.to_dict()) == info
+    # Unset optional keys are left out of the parse_wsdl() dict shape
+    assert ServiceInfo(service_name="Roads").to_dict() == {
+        "service_name": "Roads", "target_namespace": "", "operations": [], "title": "",
+    }
+
+
+def test_rest_enrichment_round_trip_and_missing_layer_ids():
+    rest = extract_enrichment(REST_JSON)
+    assert rest.layers.to_list() == [
+        {"id": 0, "name": "Activities", "type": "Feature Layer", "description": ""},
+        {"id": None, "name": "NoId", "type": "", "description": ""},
+    ]
+    assert RestEnrichment.from_dict(rest.to_dict()) == rest
+    assert rest.to_dict()["document_keywords"] == ["activities", "facts"]
+
+
+def test_layer_table_id_sentinel_is_not_a_real_id():
+    table = LayerTable([{"id": -1, "name": "a"}, {"id": "7", "name": "b"}, {"name": "c"}])
+    assert [layer["id"] for layer in table] == [None, None, None]
+    assert len(LayerTable(None)) == 0
+    assert LayerTable([{"id": 3, "name": "x"}]) == LayerTable([{"id": 3, "name": "x"}])
+
+
+def test_ai_result_merge_and_round_trip():
+    base = AiResult.from_dict({"description": "base", "modified": "2020-01-01"})
+    override = AiResult.from_dict({"modified": "2024-01-15", "theme": ["biota"]})
+    merged = base.merged(override)
+    assert merged.to_dict() == {"description": "base", "modified": "2024-01-15", "theme": ["biota"]}
+    assert base.to_dict() == {"description": "base", "modified": "2020-01-01"}
+
+    copy = base.merged(None)
+    assert copy == base and copy is not base
+    assert AiResult.from_dict(AI_VALUES).to_dict() == AI_VALUES
+    assert AiResult.from_dict(AI_VALUES).filled_count() == 9
+
+
+# The golden files in tests/data were rendered by the dict-based pipeline
+# that preceded the record types; the records must not change any output.
+
+def test_dcat_us_matches_dict_pipeline():
+    catalog = build_dcat_us(parse_wsdl(SAMPLE_WSDL), AiResult.from_dict(AI_VALUES))
+    expected = json.loads((DATA / "activity_facts_dcat_us.json").read_text(encoding="utf-8"))
+    assert catalog == expected
+
+
+def test_prompt_matches_dict_pipeline():
+    prompt = build_gap_fill_prompt(parse_wsdl(SAMPLE_WSDL), extract_enrichment(REST_JSON))
+    assert prompt == (DATA / "activity_facts_prompt.txt").read_text(encoding="utf-8")
+
+
+def test_gap_report_matches_dict_pipeline(tmp_path):
+    md, _path = gap_report(
+        parse_wsdl(SAMPLE_WSDL),
+        ai_results=AiResult.from_dict(AI_VALUES),
+        ai_metadata={"source": "ai", "model": "m", "confidence": {"theme": {"level": "high", "reasoning": "r"}}},
+        output_dir=tmp_path,
+    )
+    md = re.sub(r"\d{4}-\d{2}-\d{2}[ T_]\d{2}:\d{2}(:\d{2})?", "<ts>", md)
+    assert md == (DATA / "activity_facts_gap_report.md").read_text(encoding="utf-8")
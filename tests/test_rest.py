@@ -0,0 +1,39 @@
+import pytest
+
+from metagen.readers.rest import extract_enrichment, rest_gap_values, wsdl_endpoint_to_rest_url
+
+
+def test_wsdl_endpoint_to_rest_url():
+    assert wsdl_endpoint_to_rest_url(
+        "https://apps.fs.usda.gov/arcx/services/EDW/EDW_Roads_01/MapServer"
+    ) == "https://apps.fs.usda.gov/arcx/rest/services/EDW/EDW_Roads_01/MapServer?f=json"
+
+
+@pytest.mark.parametrize(
+    "extent, spatial",
+    [
+        (
+            {"xmin": -120, "ymin": 40, "xmax": -119, "ymax": 41, "spatialReference": {"wkid": 4269}},
+            "-120.0000,40.0000,-119.0000,41.0000",
+        ),
+        (
+            {"xmin": -13358338.9, "ymin": 4865942.3, "xmax": -13247019.4, "ymax": 5012341.7,
+             "spatialReference": {"wkid": 102100, "latestWkid": 3857}},
+            "-120.0000,40.0000,-119.0000,41.0000",
+        ),
+        ({"xmin": 500000, "ymin": 4400000, "xmax": 600000, "ymax": 4500000,
+          "spatialReference": {"wkid": 26911}}, None),
+        ({"xmin": "NaN", "ymin": 0, "xmax": 1, "ymax": 1}, None),
+    ],
+)
+def test_rest_gap_values_spatial(extent, spatial):
+    values = rest_gap_values(extract_enrichment({"description": "Roads.", "fullExtent": extent}))
+    assert values.spatial == spatial
+    assert values.description == "Roads."
+
+
+def test_rest_gap_values_description_and_empty():
+    rest = extract_enrichment({"serviceDescription": "<div>Forest <b>roads</b>.</div>\n"})
+    assert rest_gap_values(rest).description == "Forest roads."
+    assert rest_gap_values(extract_enrichment({})) is None
+    assert rest_gap_values(None) is None
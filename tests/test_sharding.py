@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from metagen.cli.main import main
+from metagen.reports.gap import merge_gap_stats, new_gap_stats
+from metagen.sharding import in_shard, parse_shard, shard_index, shard_label
+
+
+def test_parse_shard():
+    assert parse_shard("2/8") == (2, 8)
+    assert parse_shard(" 1 / 1 ") == (1, 1)
+    for bad in ("0/3", "4/3", "1/0", "3", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shard_assignment_is_stable():
+    # SHA-1 based, so fixed across processes, machines and Python versions
+    key = "https://apps.fs.usda.gov/arcx/services/EDW/EDW_Roads_01/MapServer"
+    assert shard_index(key, 4) == shard_index(key, 4)
+    assert [shard_index(key, n) for n in (1, 2, 3, 4, 5)] == [0, 0, 2, 0, 4]
+    assert sum(in_shard(key, k, 5) for k in range(1, 6)) == 1
+    assert shard_label(2, 8) == "shard-2-of-8"
+
+
+def test_merge_gap_stats_sums_counts():
+    a, b = new_gap_stats(), new_gap_stats()
+    a["records"], b["records"] = 2, 3
+    a["standards"]["WSDL"] = 2
+    b["standards"]["WSDL"] = 1
+    b["standards"]["FGDC CSDGM"] = 2
+    a["fields"]["theme"]["gap"] = 2
+    b["fields"]["theme"]["ai"] = 3
+    merged = merge_gap_stats(a, b)
+    assert merged["records"] == 5
+    assert merged["standards"] == {"WSDL": 3, "FGDC CSDGM": 2}
+    assert merged["fields"]["theme"] == {"source": 0, "local": 0, "ai": 3, "gap": 2}
+
+
+def _crosswalk(*args):
+    result = CliRunner().invoke(main, ["crosswalk", *map(str, args)])
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def _merge(*args):
+    return CliRunner().invoke(main, ["merge", *map(str, args)])
+
+
+def _stats(path):
+    stats = json.loads(path.read_text(encoding="utf-8"))
+    stats.pop("shard", None)
+    return stats
+
+
+@pytest.mark.parametrize("options", [(), ("--local-themes",)])
+def test_sharded_run_merges_to_unsharded_result(wsdl_dir, tmp_path, options):
+    _crosswalk(wsdl_dir, tmp_path / "all.json", *options)
+    full = json.loads((tmp_path / "all.json").read_text(encoding="utf-8"))
+
+    shards = []
+    for k in (1, 2, 3):
+        _crosswalk(wsdl_dir, tmp_path / "out.json", "--shard", f"{k}/3", *options)
+        shards.append(tmp_path / f"out.shard-{k}-of-3.json")
+
+    result = _merge(*shards, "-o", tmp_path / "merged.json")
+    assert result.exit_code == 0, result.output
+    merged = json.loads((tmp_path / "merged.json").read_text(encoding="utf-8"))
+
+    assert len(merged["dataset"]) == len(full["dataset"]) == 8
+    def by_id(catalog):
+        return sorted(catalog["dataset"], key=lambda d: d["identifier"])
+
+    assert by_id(merged) == by_id(full)
+
+    merged_stats = new_gap_stats()
+    for shard in shards:
+        merged_stats = merge_gap_stats(merged_stats, _stats(shard.with_suffix(".gap_stats.json")))
+    assert merged_stats == _stats(tmp_path / "all.gap_stats.json")
+
+
+def test_merge_rejects_duplicate_and_mismatched_shards(wsdl_dir, tmp_path):
+    _crosswalk(wsdl_dir, tmp_path / "a.json", "--shard", "1/2")
+    _crosswalk(wsdl_dir, tmp_path / "b.json", "--shard", "1/2")
+    _crosswalk(wsdl_dir, tmp_path / "c.json", "--shard", "2/3")
+    a = tmp_path / "a.shard-1-of-2.json"
+    b = tmp_path / "b.shard-1-of-2.json"
+    c = tmp_path / "c.shard-2-of-3.json"
+
+    result = _merge(a, b, "-o", tmp_path / "m.json")
+    assert result.exit_code != 0
+    assert "given twice" in result.output
+
+    result = _merge(a, c, "-o", tmp_path / "m.json")
+    assert result.exit_code != 0
+    assert "different N" in result.output
+
+
+def test_merge_warns_about_missing_shards(wsdl_dir, tmp_path):
+    _crosswalk(wsdl_dir, tmp_path / "out.json", "--shard", "1/3")
+    result = _merge(tmp_path / "out.shard-1-of-3.json", "-o", tmp_path / "m.json")
+    assert result.exit_code == 0
+    assert "shards not merged: 2, 3" in result.output
+
+
+def test_merge_requires_stats_file(wsdl_dir, tmp_path):
+    _crosswalk(wsdl_dir, tmp_path / "out.json", "--shard", "1/3")
+    (tmp_path / "out.shard-1-of-3.gap_stats.json").unlink()
+    result = _merge(tmp_path / "out.shard-1-of-3.json", "-o", tmp_path / "m.json")
+    assert result.exit_code != 0
+    assert "Missing gap statistics" in result.output
@@ -0,0 +1,68 @@
+import pytest
+
+from metagen.metadata.themes import classify_corpus, tokenize
+from metagen.records import LayerTable, RestEnrichment, ServiceInfo
+
+
+def _classify(*names, rest=None, **kwargs):
+    return classify_corpus([(ServiceInfo(service_name=n), rest) for n in names], **kwargs)
+
+
+def test_tokenize_splits_camel_and_snake_case():
+    assert tokenize("EDW_RoadBasic_01 MapServer") == ["road", "basic"]
+
+
+@pytest.mark.parametrize(
+    "name", ["EDW_ActivityPolygon_01", "EDW_UseRestriction_01", "EDW_StatusPoint_01", "EDW_Range_01"]
+)
+def test_single_seed_hit_defers_to_llm(name):
+    result, _other = _classify(name, "EDW_Other_01")
+    assert result.themes
+    assert result.confidence <= 0.5
+    assert not result.confident
+
+
+def test_several_matching_terms_are_confident():
+    road, water = _classify("EDW_Roads_Trails_01", "EDW_StreamRiver_Hydrography_01")
+    assert road.themes == ("transportation",) and road.confident
+    assert water.themes == ("inlandWaters",) and water.confident
+    assert "roads" in road.keywords
+
+
+def test_rest_evidence_raises_confidence():
+    [bare] = _classify("EDW_RoadBasic_01")
+    rest = RestEnrichment(
+        service_description="Forest Service road centerlines and motor vehicle routes.",
+        layers=LayerTable([{"id": 0, "name": "Roads"}, {"id": 1, "name": "Trails"}]),
+    )
+    [enriched] = _classify("EDW_RoadBasic_01", rest=rest)
+    assert not bare.confident
+    assert enriched.confident and enriched.themes[0] == "transportation"
+
+
+def test_no_topical_terms_and_empty_corpus():
+    [result] = _classify("EDW_Layer1_01")
+    assert result.themes == () and result.confidence == 0 and not result.confident
+    assert classify_corpus([]) == []
+
+
+def test_result_does_not_depend_on_the_batch():
+    rest = RestEnrichment(
+        service_description="Road and trail crossings of streams, with culverts and bridges.",
+        layers=LayerTable([{"id": 0, "name": "Stream Crossings"}, {"id": 1, "name": "Roads"}]),
+    )
+    services = [
+        (ServiceInfo(service_name="EDW_RoadStreamCrossings_01"), rest),
+        (ServiceInfo(service_name="EDW_StreamRiver_Hydrography_01"), None),
+        (ServiceInfo(service_name="EDW_Roads_Trails_01"), None),
+    ]
+    batch = classify_corpus(services)
+    assert [classify_corpus([service])[0] for service in services] == batch
+    assert batch[0].themes == ("transportation", "inlandWaters")
+    assert 0 < batch[0].confidence < 1
+
+
+def test_keywords_rank_by_frequency_then_first_occurrence():
+    rest = RestEnrichment(service_description="Trails and roads; trails closed to motor vehicles.")
+    [result] = _classify("EDW_Roads_Trails_01", rest=rest)
+    assert result.keywords[:4] == ("trails", "roads", "closed", "motor")
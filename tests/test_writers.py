@@ -0,0 +1,136 @@
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+from click.testing import CliRunner
+
+from metagen.cli.main import main
+from metagen.metadata.fgdc import write_fgdc
+from metagen.metadata.iso19115 import write_iso19115
+from metagen.metadata.model import PLACEHOLDER, build_record
+from metagen.metadata.xml_stream import XmlStream
+from metagen.records import AiResult, ServiceInfo
+
+NS = {
+    "gmd": "http://www.isotc211.org/2005/gmd",
+    "gco": "http://www.isotc211.org/2005/gco",
+    "gml": "http://www.opengis.net/gml/3.2",
+}
+
+
+def _record(**values):
+    info = ServiceInfo(
+        service_name="EDW_Roads_01_MapServer",
+        title="EDW Roads",
+        endpoint_url="https://apps.fs.usda.gov/arcx/services/EDW/EDW_Roads_01/MapServer",
+        operations=("ExportMapImage",),
+    )
+    return build_record(info, ai_results=AiResult.from_dict(values))
+
+
+def _render(write, record):
+    fh = io.BytesIO()
+    write(record, fh)
+    return ET.fromstring(fh.getvalue())
+
+
+def test_xml_stream_indents_and_escapes():
+    fh = io.BytesIO()
+    xml = XmlStream(fh)
+    xml.start_document()
+    with xml.element("root", {"a": "1"}):
+        xml.leaf("name", "Roads & <Trails>")
+        xml.leaf("empty", None)
+        with xml.element("group"):
+            xml.leaf("item", "x")
+    xml.end_document()
+    assert fh.getvalue().decode("utf-8") == (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<root a="1">\n'
+        "  <name>Roads &amp; &lt;Trails&gt;</name>\n"
+        "  <empty/>\n"
+        "  <group>\n"
+        "    <item>x</item>\n"
+        "  </group>\n"
+        "</root>\n"
+    )
+
+
+def test_iso19115_record():
+    root = _render(write_iso19115, _record(
+        description="Road centerlines.",
+        spatial="-124.8,24.5,-66.9,49.4",
+        temporal="2020-01-01/P5Y",
+        theme=["transportation"],
+        bureauCode=["005:96"],
+    ))
+    ident = root.find("gmd:identificationInfo/gmd:MD_DataIdentification", NS)
+    title = ident.find("gmd:citation/gmd:CI_Citation/gmd:title/gco:CharacterString", NS)
+    assert title.text == "EDW Roads"
+    assert ident.find("gmd:abstract/gco:CharacterString", NS).text == "Road centerlines."
+    assert ident.find("gmd:topicCategory/gmd:MD_TopicCategoryCode", NS).text == "transportation"
+    assert [c.text for c in ident.iterfind(".//gmd:MD_Identifier/gmd:code/gco:CharacterString", NS)] == [
+        "005:96"
+    ]
+    west = ident.find(".//gmd:westBoundLongitude/gco:Decimal", NS)
+    assert float(west.text) == -124.8
+    period = ident.find(".//gml:TimePeriod", NS)
+    assert period.find("gml:beginPosition", NS).text == "2020-01-01"
+    assert period.find("gml:endPosition", NS).text == "2025-01-01"
+    online = root.find(".//gmd:CI_OnlineResource", NS)
+    assert online.find("gmd:linkage/gmd:URL", NS).text.endswith("/EDW_Roads_01/MapServer")
+    assert online.find("gmd:protocol/gco:CharacterString", NS).text == "ESRI SOAP MapServer"
+
+
+def test_iso19115_open_interval_and_no_extent():
+    period = _render(write_iso19115, _record(temporal="R/2020-01-01/P1Y")).find(".//gml:TimePeriod", NS)
+    assert period.find("gml:endPosition", NS).get("indeterminatePosition") == "now"
+    assert _render(write_iso19115, _record()).find(".//gmd:EX_Extent", NS) is None
+
+
+def test_fgdc_record():
+    root = _render(write_fgdc, _record(
+        modified="2024-01-15",
+        spatial="-124.8,24.5,-66.9,49.4",
+        temporal="2020-01-01/P5Y",
+        theme=["transportation"],
+    ))
+    assert root.findtext("idinfo/citation/citeinfo/pubdate") == "20240115"
+    assert root.findtext("idinfo/timeperd/timeinfo/rngdates/begdate") == "20200101"
+    assert root.findtext("idinfo/timeperd/timeinfo/rngdates/enddate") == "20250101"
+    assert root.findtext("idinfo/timeperd/current") == PLACEHOLDER
+    assert root.findtext("idinfo/spdom/bounding/northbc") == "49.4"
+    assert root.findtext("idinfo/keywords/theme/themekey") == "transportation"
+    assert root.findtext("distinfo/stdorder/digform/digtinfo/formname") == "ESRI SOAP MapServer"
+
+
+def test_fgdc_gaps_use_placeholders():
+    root = _render(write_fgdc, _record())
+    assert root.findtext("idinfo/timeperd/timeinfo/sngdate/caldate") == PLACEHOLDER
+    assert root.findtext("idinfo/spdom/bounding/westbc") == PLACEHOLDER
+    assert root.findtext("idinfo/timeperd/current") == PLACEHOLDER
+
+
+def test_fgdc_repeating_interval_is_ongoing():
+    root = _render(write_fgdc, _record(temporal="R/2020-01-01/P1Y"))
+    assert root.findtext("idinfo/timeperd/timeinfo/rngdates/enddate") == "Present"
+
+
+def _crosswalk(tmp_path, wsdl_text, *args):
+    wsdl = tmp_path / "EDW_Roads_01.xml"
+    wsdl.write_text(wsdl_text("EDW_Roads_01"), encoding="utf-8")
+    return CliRunner().invoke(main, ["crosswalk", str(wsdl), *args])
+
+
+def test_formats_writes_each_requested_file(tmp_path, wsdl_text):
+    result = _crosswalk(tmp_path, wsdl_text, "--formats", " FGDC, iso19115,fgdc ")
+    assert result.exit_code == 0, result.output
+    written = sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("EDW_Roads_01_"))
+    assert written == ["EDW_Roads_01_fgdc.xml", "EDW_Roads_01_iso19115.xml"]
+
+
+@pytest.mark.parametrize("value, message", [("kml", "unknown format 'kml'"), (" , ", "at least one format")])
+def test_formats_rejects_bad_values(tmp_path, wsdl_text, value, message):
+    result = _crosswalk(tmp_path, wsdl_text, "--formats", value)
+    assert result.exit_code == 2
+    assert message in result.output